@@ -3,26 +3,64 @@
 from __future__ import annotations
 
 import base64
+import functools
+import math
 import json
+import logging
 import time
 import random
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Any, Optional, Callable, Dict, List
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 
 GITHUB_API = "https://api.github.com"
+GITHUB_GRAPHQL = f"{GITHUB_API}/graphql"
 DEFAULT_TIMEOUT = 30
 
-# ✅ Reaproveita conexão HTTP (melhora tempo de GET/PUT)
+log = logging.getLogger(__name__)
+
+# ✅ Reaproveita conexão HTTP (melhora tempo de GET/PUT): keep-alive com pool próprio
+# para api.github.com; o módulo é importado 1x por processo, então a Session vale
+# para todos os reruns/sessões.
+# Retry de transporte só em GET: repetir um PUT cuja resposta se perdeu (502/504)
+# poderia reaplicar o updater e duplicar o registro.
+class _RetryEsperaLimitada(Retry):
+    """Retry que respeita o Retry-After, mas nunca dorme mais que _MAX_ESPERA (render esperando)."""
+
+    def get_retry_after(self, response):
+        espera = super().get_retry_after(response)
+        return None if espera is None else min(espera, _MAX_ESPERA)
+
+
 SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=10,
+    max_retries=_RetryEsperaLimitada(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 502, 503, 504),  # 429: Retry-After respeitado até _MAX_ESPERA
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    ),
+))
 
 
 # ---------------------------------------------
 #  GITHUB CORE
 # ---------------------------------------------
+# ✅ Secrets não mudam com o processo rodando: lidos 1x (sem st.secrets a cada chamada).
+# O dict é compartilhado; quem precisar de header extra faz cópia ({**gh_headers(), ...}).
+@functools.lru_cache(maxsize=1)
 def gh_headers() -> Dict[str, str]:
     return {
         "Authorization": f"Bearer {st.secrets['GITHUB_TOKEN']}",
@@ -30,6 +68,7 @@ def gh_headers() -> Dict[str, str]:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def gh_repo_info() -> Tuple[str, str, str]:
     owner = st.secrets["GITHUB_OWNER"]
     repo = st.secrets["GITHUB_REPO"]
@@ -37,50 +76,258 @@ def gh_repo_info() -> Tuple[str, str, str]:
     return owner, repo, branch
 
 
+# ✅ Cache de ETag por path: {path: (etag, bytes_json, sha)}.
+# GET condicional (If-None-Match) -> 304 não baixa o arquivo de novo (nem gasta rate limit).
+# Após um PUT guarda o conteúdo gravado com etag "" (não há ETag novo): safe_update_json
+# parte dele na próxima escrita sem GET; gh_get_file também o usa por _JANELA_POS_PUT s.
+@st.cache_resource
+def _gh_etag_cache() -> Dict[str, Tuple[str, bytes, str]]:
+    return {}
+
+
+# ✅ Quando (time.monotonic) este processo gravou cada path. Logo após salvar, a tela
+# relê o arquivo (buscar_* invalidado): o conteúdo já é conhecido, então gh_get_file
+# responde do cache sem GET nessa janela. Escrita de outra sessão no meio vira 409 no
+# próximo PUT, que relê normalmente.
+_JANELA_POS_PUT = 10.0
+
+
+@st.cache_resource
+def _gh_pos_put() -> Dict[str, float]:
+    return {}
+
+
+# Readers cacheados (st.cache_data) por path, limpos após gravação bem-sucedida
+_LEITORES: Dict[str, List[Any]] = {}
+
+
+def _leitor_de(path: str):
+    """Registra um reader cacheado de `path` para ser invalidado em safe_update_json."""
+    def deco(fn):
+        _LEITORES.setdefault(path, []).append(fn)
+        return fn
+    return deco
+
+
+def _invalidar_leitores(path: str) -> None:
+    for fn in _LEITORES.get(path, ()):
+        fn.clear()
+
+
+# Arquivos que são lista de valores simples, não de registros (ex.: nomes em pessoas.json)
+_LISTAS_DE_VALORES = frozenset({"pessoas.json"})
+
+
+def _loads(raw: Any, path: str) -> Any:
+    """
+    orjson.loads + validação única na entrada: em listas de registros, descarta o
+    que não for dict. Daqui em diante readers/updaters confiam que toda linha é dict.
+    Arquivos em _LISTAS_DE_VALORES passam intactos.
+    Atenção: o próximo safe_update_json grava a lista já filtrada (as linhas descartadas
+    somem do arquivo); por isso o descarte é sempre registrado no log, com path e quantidade.
+    """
+    try:
+        obj = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # Arquivos antigos gravados pelo json.dumps podem ter NaN/Infinity (ex.: valor
+        # NaN vindo de DataFrame); orjson recusa esses literais, o json aceita.
+        # Na próxima gravação o orjson os escreve como null.
+        obj = json.loads(raw)
+    if type(obj) is list and path.rsplit("/", 1)[-1] not in _LISTAS_DE_VALORES:
+        if any(type(r) is not dict for r in obj):
+            n = len(obj)
+            obj = [r for r in obj if type(r) is dict]
+            log.warning("[GitHub] %s: %d linha(s) que não são registro (dict) descartada(s)", path, n - len(obj))
+    return obj
+
+
 def gh_get_file(path: str) -> Tuple[Optional[Any], Optional[str]]:
     """
     Lê JSON no GitHub (contents API) e retorna (obj, sha).
+    Usa GET condicional com ETag: em 304 reaproveita o conteúdo já baixado.
     """
     owner, repo, branch = gh_repo_info()
     url = f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}?ref={branch}"
 
+    cache = _gh_etag_cache()
+    hit = cache.get(path)
+    if hit and not hit[0] and time.monotonic() - _gh_pos_put().get(path, float("-inf")) < _JANELA_POS_PUT:
+        return _loads(hit[1], path), hit[2]  # acabou de ser gravado por este processo
+
+    headers = gh_headers()
+    if hit and hit[0]:
+        headers = {**headers, "If-None-Match": hit[0]}
+
     try:
-        r = SESSION.get(url, headers=gh_headers(), timeout=DEFAULT_TIMEOUT)
+        r = SESSION.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
     except Exception as e:
         st.error(f"[GitHub] Falha de rede ao ler {path}: {e}")
         return None, None
 
+    if r.status_code == 304 and hit and hit[0]:
+        # loads de novo: o obj retornado é mutado pelos updaters, não pode ser compartilhado
+        return _loads(hit[1], path), hit[2]
+
     if r.status_code == 200:
         try:
             data = r.json()
-            content = base64.b64decode(data["content"]).decode("utf-8")
-            return json.loads(content), data["sha"]
+            raw = base64.b64decode(data["content"])
+            obj = _loads(raw, path)  # ✅ bytes direto, sem .decode("utf-8")
         except Exception as e:
             st.error(f"[GitHub] Erro ao decodificar JSON de {path}: {e}")
             return None, None
+        etag = r.headers.get("ETag")
+        if etag:
+            cache[path] = (etag, raw, data["sha"])
+        return obj, data["sha"]
 
     if r.status_code == 404:
+        cache.pop(path, None)
         return None, None
 
     st.error(f"[GitHub] Erro ao ler {path}: {r.status_code} {r.text}")
     return None, None
 
 
-def gh_put_file(path: str, obj: Any, message: str, sha: Optional[str]) -> Optional[str]:
+def _gh_get_file_ref(path: str, ref: str) -> Tuple[Optional[Any], Optional[str]]:
     """
-    Grava JSON no GitHub (contents API).
-    Retorna novo sha ou None.
-    Obs.: 409 (conflito SHA) retorna None silenciosamente para permitir retry.
+    Lê `path` exatamente em `ref` (sha de commit), sem ETag nem cache pós-PUT:
+    usado por gh_commit_multi, que precisa do conteúdo do HEAD que vai virar pai.
+    404 -> (None, None) (arquivo novo); qualquer outra falha levanta exceção.
+    """
+    owner, repo, _branch = gh_repo_info()
+    url = f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}?ref={ref}"
+    r = SESSION.get(url, headers=gh_headers(), timeout=DEFAULT_TIMEOUT)
+    if r.status_code == 404:
+        return None, None
+    r.raise_for_status()
+    data = r.json()
+    return _loads(base64.b64decode(data["content"]), path), data["sha"]
+
+
+def gh_get_files(paths: List[str], ref: Optional[str] = None) -> Dict[str, Tuple[Optional[Any], Optional[str]]]:
+    """
+    gh_get_file em paralelo (até 8 GETs simultâneos na SESSION, pool_maxsize=10):
+    o tempo total vira o do GET mais lento, não a soma. Retorna {path: (obj, sha)}.
+    Nas threads não há contexto de script: erros de leitura só resultam em (None, None).
+    Com `ref` lê naquele commit (_gh_get_file_ref): sem cache, e erro levanta exceção.
+    """
+    ler = functools.partial(_gh_get_file_ref, ref=ref) if ref else gh_get_file
+    if len(paths) <= 1:
+        return {p: ler(p) for p in paths}
+    with ThreadPoolExecutor(max_workers=min(8, len(paths)), thread_name_prefix="gh-get") as ex:
+        return dict(zip(paths, ex.map(ler, paths)))
+
+
+def gh_batch_get(paths: List[str], ref: Optional[str] = None) -> Dict[str, Tuple[Optional[Any], Optional[str]]]:
+    """
+    Lê vários JSON numa única requisição (GraphQL) e retorna {path: (obj, sha)}.
+    O `oid` do blob é o mesmo sha da contents API (serve para o PUT).
+    `ref`: branch ou sha de commit (padrão: branch configurado).
+    Se o GraphQL falhar, ou um blob vier truncado, cai para gh_get_files (paralelo) nesses paths.
+    Com `ref`, o fallback também lê naquele commit e erros levantam exceção (nunca
+    devolve conteúdo de outra versão nem (None, None) por falha de leitura).
     """
     owner, repo, branch = gh_repo_info()
-    url = f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}"
+    rev = ref or branch
+    campos = " ".join(
+        f'f{i}: object(expression: {json.dumps(f"{rev}:{p}")}) {{ ... on Blob {{ text oid isTruncated }} }}'
+        for i, p in enumerate(paths)
+    )
+    query = f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {campos} }} }}"
+
+    repo_data = None
+    try:
+        r = SESSION.post(
+            GITHUB_GRAPHQL,
+            headers=gh_headers(),
+            json={"query": query, "variables": {"owner": owner, "name": repo}},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        if r.status_code == 200:
+            repo_data = (r.json().get("data") or {}).get("repository")
+    except Exception:
+        repo_data = None
+
+    if repo_data is None:
+        return gh_get_files(paths, ref=ref)
+
+    out: Dict[str, Tuple[Optional[Any], Optional[str]]] = {}
+    truncados: List[str] = []
+    # Só o branch configurado alimenta o cache (leitura em sha fixo não é o estado atual)
+    cache = None if ref else _gh_etag_cache()
+    for i, p in enumerate(paths):
+        blob = repo_data.get(f"f{i}")
+        if not blob:
+            out[p] = (None, None)  # arquivo inexistente (equivale ao 404)
+            continue
+        if blob.get("isTruncated") or blob.get("text") is None:
+            truncados.append(p)
+            continue
+        try:
+            out[p] = (_loads(blob["text"], p), blob["oid"])
+        except Exception as e:
+            if ref:
+                raise
+            st.error(f"[GitHub] Erro ao decodificar JSON de {p}: {e}")
+            out[p] = (None, None)
+            continue
+        if cache is not None:
+            hit = cache.get(p)
+            recente = time.monotonic() - _gh_pos_put().get(p, float("-inf")) < _JANELA_POS_PUT
+            if (not hit or hit[2] != blob["oid"]) and not recente:  # não sobrescreve o próprio PUT
+                # ✅ semeia bytes + sha para o 1º PUT de safe_update_json dispensar o GET;
+                # etag vazio: gh_get_file ainda faz GET completo (revalida) fora da janela pós-PUT
+                cache[p] = ("", blob["text"].encode("utf-8"), blob["oid"])
+    if truncados:
+        out.update(gh_get_files(truncados, ref=ref))
+    return out
+
+
+def _json_bytes(obj: Any) -> bytes:
+    # ✅ orjson já gera UTF-8 em bytes; sem indent (payload ~25% menor no PUT).
+    # OPT_SERIALIZE_NUMPY: patches vindos de DataFrame podem trazer np.int64/np.float64.
+    # OPT_NON_STR_KEYS: chaves int/date viram str, como o json.dumps fazia.
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+# Conflito de versão (controle otimista): 409 = sha não confere; 422 = sha ausente/
+# inválido para arquivo que já existe (ex.: criado por outra sessão). Relê e reaplica.
+_CONFLITO_SHA = (409, 422)
+_MAX_BACKOFF = 8.0   # teto do backoff exponencial entre tentativas (s)
+_MAX_ESPERA = 30.0   # teto para Retry-After / reset do rate limit: a tela está esperando
+
+
+def _retry_after(r: requests.Response) -> float:
+    """Segundos pedidos pelo GitHub (Retry-After ou reset do rate limit); 0.0 se não houver."""
+    ra = r.headers.get("Retry-After", "")
+    if ra.isdigit():
+        return float(ra)
+    if r.status_code in (403, 429) and r.headers.get("X-RateLimit-Remaining") == "0":
+        reset = _to_int_or_none(r.headers.get("X-RateLimit-Reset"))
+        if reset:
+            return max(0.0, reset - time.time())
+    return 0.0
+
 
-    content_str = json.dumps(obj, ensure_ascii=False, indent=2)
-    content_b64 = base64.b64encode(content_str.encode("utf-8")).decode("utf-8")
+def _backoff(attempt: int, delay: float, espera: float = 0.0) -> None:
+    """Exponencial com jitter (delay * 2^attempt, até _MAX_BACKOFF); respeita `espera` do servidor."""
+    base = min(_MAX_BACKOFF, delay * (2 ** attempt)) * (0.5 + random.random() * 0.7)
+    time.sleep(max(base, min(espera, _MAX_ESPERA)))
+
+
+def _gh_put(path: str, raw: bytes, message: str, sha: Optional[str]) -> Tuple[Optional[str], int, float]:
+    """
+    PUT na contents API com o JSON já serializado. Retorna (novo_sha, status_http, espera);
+    status 0 = falha de rede; espera = Retry-After/rate limit em segundos (0.0 se não houver).
+    Conflito de sha (_CONFLITO_SHA) e rate limit não mostram erro: o retry cuida.
+    """
+    owner, repo, branch = gh_repo_info()
+    url = f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}"
 
     payload = {
         "message": message or f"update {path}",
-        "content": content_b64,
+        "content": base64.b64encode(raw).decode("ascii"),
         "branch": branch
     }
     if sha:
@@ -90,20 +337,29 @@ def gh_put_file(path: str, obj: Any, message: str, sha: Optional[str]) -> Option
         r = SESSION.put(url, headers=gh_headers(), json=payload, timeout=DEFAULT_TIMEOUT)
     except Exception as e:
         st.error(f"[GitHub] Falha de rede ao gravar {path}: {e}")
-        return None
+        return None, 0, 0.0
 
     if r.status_code in (200, 201):
         try:
-            return r.json()["content"]["sha"]
+            return r.json()["content"]["sha"], r.status_code, 0.0
         except Exception:
-            return None
+            return None, r.status_code, 0.0
 
-    # ✅ 409 = conflito SHA (arquivo mudou entre GET e PUT). Deixa retry cuidar.
-    if r.status_code == 409:
-        return None
+    # ✅ Conflito SHA (arquivo mudou entre GET e PUT). Deixa retry cuidar.
+    espera = _retry_after(r)
+    if r.status_code not in _CONFLITO_SHA and not espera:
+        st.error(f"[GitHub] Erro ao gravar {path}: {r.status_code} {r.text}")
+    return None, r.status_code, espera
 
-    st.error(f"[GitHub] Erro ao gravar {path}: {r.status_code} {r.text}")
-    return None
+
+def gh_put_file(path: str, obj: Any, message: str, sha: Optional[str]) -> Optional[str]:
+    """
+    Grava JSON no GitHub (contents API).
+    Retorna novo sha ou None.
+    Obs.: 409 (conflito SHA) retorna None silenciosamente para permitir retry.
+    """
+    new_sha, _status, _espera = _gh_put(path, _json_bytes(obj), message, sha)
+    return new_sha
 
 
 def safe_update_json(
@@ -117,13 +373,27 @@ def safe_update_json(
     Lê (obj, sha) -> aplica updater(obj) -> grava com sha -> retry em conflito/falha.
 
     Estratégia:
-    - 409 (conflito) tenta novamente com jitter
+    - 1ª tentativa otimista: parte do (obj, sha) em cache (último GET/PUT deste processo),
+      sem GET; se o sha estiver velho o GitHub responde 409 e aí relê
+    - 409 com o cache: relê na hora (sem sleep); demais falhas: backoff exponencial
+      com jitter, respeitando Retry-After / reset do rate limit (429/403)
+    - outros 4xx (sem rate limit) não se resolvem tentando de novo: desiste na hora
     - mostra erro somente após esgotar tentativas
     """
+    batch = getattr(_BATCH, "writer", None)
+    if batch is not None:
+        batch.add(path, updater, commit_message)  # grava na saída do batch_writes()
+        return None, None
+
     last_err: Optional[str] = None
+    cache = _gh_etag_cache()
 
     for attempt in range(max_retries):
-        obj, sha = gh_get_file(path)
+        hit = cache.get(path) if attempt == 0 else None
+        if hit:
+            obj, sha = _loads(hit[1], path), hit[2]
+        else:
+            obj, sha = gh_get_file(path)
 
         try:
             new_obj = updater(obj)
@@ -131,19 +401,347 @@ def safe_update_json(
             st.error(f"[GitHub] updater falhou em {path}: {e}")
             return None, None
 
-        new_sha = gh_put_file(path, new_obj, commit_message or f"update {path}", sha)
+        raw = _json_bytes(new_obj)
+        new_sha, status, espera = _gh_put(path, raw, commit_message or f"update {path}", sha)
         if new_sha:
+            cache[path] = ("", raw, new_sha)
+            _gh_pos_put()[path] = time.monotonic()
+            _invalidar_leitores(path)
             return new_obj, new_sha
 
-        last_err = f"tentativa {attempt+1}/{max_retries} falhou (possível conflito/concorrência)."
+        cache.pop(path, None)
+        conflito = status in _CONFLITO_SHA
+        last_err = f"tentativa {attempt+1}/{max_retries} falhou ({status}{', conflito de versão' if conflito else ''})."
+
+        if hit and conflito:
+            continue  # só o cache estava velho: relê já, sem esperar
+        if 400 <= status < 500 and not conflito and not espera:
+            break  # credencial/permissão/caminho/payload: repetir não adianta
 
         # jitter reduz colisão entre sessões/reruns
-        time.sleep(delay * (1.0 + random.random() * 0.7))
+        _backoff(attempt, delay, espera)
 
     st.error(f"[GitHub] Não foi possível atualizar {path} após {max_retries} tentativas. {last_err or ''}")
     return None, None
 
 
+def gh_commit_multi(
+    updaters: Dict[str, Callable[[Optional[Any]], Any]],
+    commit_message: str,
+    max_retries: int = 5,
+    delay: float = 0.6
+) -> Optional[Dict[str, Any]]:
+    """
+    Aplica vários updaters ({path: updater}) num único commit via Git Data API:
+    ref -> tree base -> lê os arquivos no commit HEAD -> tree nova (conteúdo inline,
+    sem POST de blob por arquivo) -> commit -> PATCH do ref (só fast-forward).
+
+    Todos os arquivos mudam juntos ou nenhum. Se o branch andou no meio, o PATCH
+    falha (422) e tudo é refeito a partir do novo HEAD. Retorna {path: novo_obj} ou None.
+    """
+    owner, repo, branch = gh_repo_info()
+    git = f"{GITHUB_API}/repos/{owner}/{repo}/git"
+    paths = list(updaters)
+    last_err: Optional[str] = None
+
+    for attempt in range(max_retries):
+        try:
+            r = SESSION.get(f"{git}/ref/heads/{branch}", headers=gh_headers(), timeout=DEFAULT_TIMEOUT)
+            r.raise_for_status()
+            head_sha = r.json()["object"]["sha"]
+            r = SESSION.get(f"{git}/commits/{head_sha}", headers=gh_headers(), timeout=DEFAULT_TIMEOUT)
+            r.raise_for_status()
+            base_tree = r.json()["tree"]["sha"]
+            atuais = gh_batch_get(paths, ref=head_sha)
+        except Exception as e:
+            last_err = f"leitura do HEAD falhou: {e}"
+            _backoff(attempt, delay)
+            continue
+
+        try:
+            novos = {p: updaters[p](atuais[p][0]) for p in paths}
+        except Exception as e:
+            st.error(f"[GitHub] updater falhou em commit múltiplo ({', '.join(paths)}): {e}")
+            return None
+
+        tree = [
+            {"path": p, "mode": "100644", "type": "blob", "content": _json_bytes(o).decode("utf-8")}
+            for p, o in novos.items()
+        ]
+        try:
+            r = SESSION.post(f"{git}/trees", headers=gh_headers(),
+                             json={"base_tree": base_tree, "tree": tree}, timeout=DEFAULT_TIMEOUT)
+            r.raise_for_status()
+            r = SESSION.post(f"{git}/commits", headers=gh_headers(),
+                             json={"message": commit_message, "tree": r.json()["sha"], "parents": [head_sha]},
+                             timeout=DEFAULT_TIMEOUT)
+            r.raise_for_status()
+            r = SESSION.patch(f"{git}/refs/heads/{branch}", headers=gh_headers(),
+                              json={"sha": r.json()["sha"], "force": False}, timeout=DEFAULT_TIMEOUT)
+        except Exception as e:
+            last_err = f"tentativa {attempt+1}/{max_retries} falhou: {e}"
+            _backoff(attempt, delay)
+            continue
+
+        if r.status_code == 200:
+            cache = _gh_etag_cache()
+            for p in paths:
+                cache.pop(p, None)
+                _invalidar_leitores(p)
+            return novos
+
+        # 422 = não é fast-forward (alguém commitou no meio): refaz a partir do novo HEAD
+        last_err = f"tentativa {attempt+1}/{max_retries} falhou ({r.status_code})."
+        _backoff(attempt, delay, _retry_after(r))
+
+    st.error(f"[GitHub] Não foi possível gravar {', '.join(paths)} após {max_retries} tentativas. {last_err or ''}")
+    return None
+
+
+# Batch ativo da thread atual (cada sessão Streamlit roda na sua thread)
+_BATCH = threading.local()
+
+
+class BatchWriter:
+    """
+    Agrupa gravações: dentro do `with batch_writes():`, safe_update_json só guarda
+    o updater por path; na saída aplica todos em ordem e grava tudo num commit só
+    (safe_update_json se for 1 arquivo, gh_commit_multi se forem vários).
+    Dentro do bloco os helpers retornam como se nada tivesse sido gravado ainda.
+    """
+
+    def __init__(self, commit_message: str = ""):
+        self.commit_message = commit_message
+        self._pending: Dict[str, List[Callable[[Optional[Any]], Any]]] = {}
+        self._messages: List[str] = []
+        self.result: Optional[Dict[str, Any]] = None
+
+    def add(self, path: str, updater: Callable[[Optional[Any]], Any], commit_message: str = "") -> None:
+        self._pending.setdefault(path, []).append(updater)
+        if commit_message:
+            self._messages.append(commit_message)
+
+    def __enter__(self) -> "BatchWriter":
+        if getattr(_BATCH, "writer", None) is not None:
+            raise RuntimeError("batch_writes() não pode ser aninhado")
+        _BATCH.writer = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _BATCH.writer = None
+        if exc_type is not None or not self._pending:
+            return False
+
+        message = self.commit_message or "; ".join(self._messages) or "batch update"
+        compostos = {p: _compor_updaters(ups) for p, ups in self._pending.items()}
+        if len(compostos) == 1:
+            (path, updater), = compostos.items()
+            new_obj, new_sha = safe_update_json(path, updater, commit_message=message)
+            self.result = {path: new_obj} if new_sha else None
+        else:
+            self.result = gh_commit_multi(compostos, commit_message=message)
+        return False
+
+
+def _compor_updaters(updaters: List[Callable[[Optional[Any]], Any]]) -> Callable[[Optional[Any]], Any]:
+    def run(obj):
+        for u in updaters:
+            obj = u(obj)
+        return obj
+    return run
+
+
+def batch_writes(commit_message: str = "") -> BatchWriter:
+    return BatchWriter(commit_message)
+
+
+# ---------------------------------------------
+#  FILA DE GRAVAÇÃO (fora do caminho de render)
+# ---------------------------------------------
+def _write_worker(q: "queue.Queue") -> None:
+    while True:
+        path, updater, commit_message, falhas = q.get()
+        try:
+            _obj, new_sha = safe_update_json(path, updater, commit_message=commit_message)
+            ok = bool(new_sha)
+        except Exception:
+            log.exception("[GitHub] gravação em segundo plano de %s levantou exceção", path)
+            ok = False
+        try:
+            if not ok:
+                # sem contexto de script aqui: st.error não aparece; registra e avisa a sessão
+                log.warning("[GitHub] gravação em segundo plano de %s falhou (%s)", path, commit_message)
+                if falhas is not None:
+                    falhas.append(path)
+        finally:
+            cond, pendentes = _pendentes()
+            with cond:
+                pendentes[path] -= 1
+                if not pendentes[path]:
+                    del pendentes[path]
+                cond.notify_all()
+            q.task_done()
+
+
+@st.cache_resource
+def _pendentes() -> Tuple[threading.Condition, Dict[str, int]]:
+    """Gravações ainda na fila, por path (para esperar só pelo arquivo que interessa)."""
+    return threading.Condition(), {}
+
+
+@st.cache_resource
+def _write_queue() -> "queue.Queue":
+    # 1 thread só: gravações saem na ordem em que foram enfileiradas (sem lock por path)
+    q: "queue.Queue" = queue.Queue()
+    threading.Thread(target=_write_worker, args=(q,), daemon=True, name="gh-write-queue").start()
+    return q
+
+
+def enfileirar_update(
+    path: str,
+    updater: Callable[[Optional[Any]], Any],
+    commit_message: str = "",
+    falhas: Optional[List[str]] = None,
+) -> None:
+    """
+    Agenda safe_update_json em segundo plano e retorna na hora.
+    Só para gravações cujo resultado a tela já conhece (não há retorno nem erro visível).
+    Se a gravação falhar, `path` é anexado a `falhas` (lista da sessão): a tela confere
+    no próximo rerun e descarta o estado otimista.
+    """
+    cond, pendentes = _pendentes()
+    with cond:
+        pendentes[path] = pendentes.get(path, 0) + 1
+    _write_queue().put((path, updater, commit_message, falhas))
+
+
+def aguardar_gravacoes(path: str) -> None:
+    """
+    Bloqueia até não haver gravação de `path` na fila (retorna na hora se não houver).
+    Chamar antes de reler ou gravar de forma síncrona um path que pode ter gravação
+    pendente (evita 409 e ordem trocada). Gravações de outros arquivos não são esperadas.
+    """
+    cond, pendentes = _pendentes()
+    with cond:
+        cond.wait_for(lambda: not pendentes.get(path))
+
+
+def _to_int_or_none(v: Any) -> Optional[int]:
+    """
+    int(v) sem try/except: testa o tipo antes de converter (mesmo resultado de
+    int() para int/float/str numérica); qualquer outra coisa vira None.
+    """
+    t = type(v)
+    if t is int:
+        return v
+    if t is str:
+        s = v.strip()
+        # 1 sinal no máximo ("--5" não passa); isdecimal só aceita o que int() aceita ("²" não)
+        digitos = s[1:] if s[:1] in ("-", "+") else s
+        return int(s) if digitos.isdecimal() else None
+    if t is float:
+        return int(v) if math.isfinite(v) else None
+    if t is bool:
+        return int(v)
+    return None
+
+
+_NONISH = (None, "")  # valores "vazios" vindos de formulários
+
+
+def _opt_float(v: Any) -> Optional[float]:
+    """float(v), ou None para vazio (campos opcionais como rpe, body_fat_pct)."""
+    return None if v in _NONISH else float(v)
+
+
+def _s(v: Any) -> str:
+    """Texto limpo: None -> "" e strip."""
+    return (v or "").strip()
+
+
+def _next_id(obj: List[Any]) -> int:
+    """
+    Próximo id (max + 1) numa única passada, sem montar lista intermediária.
+    Ignora registros sem id numérico. Roda dentro do retry de safe_update_json.
+    """
+    best = 0
+    for r in obj:
+        rid = _to_int_or_none(r.get("id"))
+        if rid is not None and rid > best:
+            best = rid
+    return best + 1
+
+
+def _find_idxs(obj: List[Any], rec_id: Any) -> List[int]:
+    """
+    Índices de todos os registros com id == rec_id (ids legados duplicados, ex. "5" e 5,
+    são todos alcançados, como nos updaters originais).
+    Converte o id procurado 1x; conversão por linha só em ids legados gravados como str.
+    """
+    tid = int(rec_id)
+    out = []
+    for i, r in enumerate(obj):
+        rid = r.get("id")
+        if rid == tid or (type(rid) is str and _to_int_or_none(rid) == tid):
+            out.append(i)
+    return out
+
+
+# ✅ Updaters genéricos das listas (usados via functools.partial pelos CRUDs):
+# um só corpo para o padrão inserir/atualizar/excluir por id
+def _list_insert(obj: Optional[List[Any]], reg: Dict[str, Any]) -> List[Any]:
+    obj = obj or []
+    reg2 = dict(reg)
+    reg2['id'] = _next_id(obj)
+    obj.append(reg2)
+    return obj
+
+
+def _list_update(obj: Optional[List[Any]], rec_id: Any, patch: Dict[str, Any]) -> List[Any]:
+    obj = obj or []
+    for i in _find_idxs(obj, rec_id):
+        obj[i].update(patch)
+    return obj
+
+
+def _list_delete(obj: Optional[List[Any]], rec_id: Any) -> List[Any]:
+    obj = obj or []
+    for i in reversed(_find_idxs(obj, rec_id)):  # de trás para frente: del não desloca os próximos
+        del obj[i]
+    return obj
+
+
+def _coerce_rows(obj: Any, schema: Dict[str, str], required: Tuple[str, ...] = ("id",)) -> List[Dict[str, Any]]:
+    """
+    Normaliza uma lista de registros numa passada vetorizada (pandas), no lugar
+    do try/except int()/float() linha a linha. schema = {coluna: tipo}:
+    - "int": obrigatório (deve estar em `required`); inválido ou não inteiro descarta a linha
+    - "float": inválido/vazio vira None (ou descarta, se estiver em `required`)
+    - "float0": inválido/vazio vira 0.0
+    - "str": None -> "" e strip
+    - "raw": mantém o valor como veio
+    Retorna list[dict] com tipos Python nativos (mesmo formato dos readers antigos).
+    """
+    if not obj or not isinstance(obj, list):
+        return []
+    df = pd.DataFrame.from_records(obj, columns=list(schema))
+    for c, kind in schema.items():
+        if kind in ("int", "float", "float0"):
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+            if kind == "int":
+                # "3.5" não vira 3 (poderia colidir com um id real): não inteiro é inválido
+                df[c] = df[c].mask(df[c] % 1 != 0)
+            if kind == "float0":
+                df[c] = df[c].fillna(0.0)
+        elif kind == "str":
+            df[c] = df[c].fillna("").astype(str).str.strip()
+
+    df = df.dropna(subset=list(required))
+    df = df.astype({c: "int64" for c, kind in schema.items() if kind == "int"})
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict("records")
+
+
 # ---------------------------------------------
 #  BASES (podem ser customizadas via secrets)
 # ---------------------------------------------
@@ -173,73 +771,101 @@ def estudos_path(name: str) -> str:
 #                    FINANCEIRO
 # =================================================
 TRANS_COLS = ['id', 'data', 'descricao', 'valor', 'tipo', 'categoria', 'status', 'responsavel']
+# Colunas derivadas (mês/ano int16) para filtro por inteiro em vez de .dt a cada rerun
+TRANS_DERIVED_COLS = ['_m', '_y']
+TRANS_CAT_COLS = ('tipo', 'categoria', 'status', 'responsavel')
 
 
 def _normalize_transacoes_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Espera o DataFrame montado com columns=TRANS_COLS (todas as colunas existem).
+    """
     if df.empty:
-        return pd.DataFrame(columns=TRANS_COLS)
+        return pd.DataFrame(columns=TRANS_COLS + TRANS_DERIVED_COLS)
 
-    df['data'] = pd.to_datetime(df['data'], errors='coerce')
-
-    if 'status' not in df.columns:
-        df['status'] = 'Pago'
-    df['status'] = df['status'].fillna('Pago').astype(str)
-
-    if 'responsavel' not in df.columns:
-        df['responsavel'] = 'Ambos'
-    df['responsavel'] = df['responsavel'].fillna('Ambos').astype(str)
+    # Datas gravadas como str(date) / isoformat: formato fixo evita inferir linha a linha
+    df['data'] = pd.to_datetime(df['data'], errors='coerce', format='ISO8601', cache=True)
+    df['_m'] = df['data'].dt.month.fillna(0).astype('int16')
+    df['_y'] = df['data'].dt.year.fillna(0).astype('int16')
+    df['valor'] = pd.to_numeric(df['valor'], errors='coerce').fillna(0.0)
+    # id cabe em int16/int32: downcast reduz a coluna; valor fica float64 (float32 perde centavos em somas)
+    df['id'] = pd.to_numeric(df['id'], errors='coerce', downcast='integer')
 
-    for c in TRANS_COLS:
-        if c not in df.columns:
-            df[c] = None
+    # ✅ Defaults num único fillna e categóricas direto: máscaras ==/groupby comparam
+    # códigos inteiros, não strings
+    df = df.fillna({'status': 'Pago', 'responsavel': 'Ambos', 'tipo': '', 'categoria': ''})
+    df = df.astype({c: 'category' for c in TRANS_CAT_COLS})
 
-    return df[TRANS_COLS]
+    # ✅ Ordenado 1x na carga (mais recente primeiro): as views não reordenam por rerun
+    df = df.sort_values('data', ascending=False, kind='stable', na_position='last', ignore_index=True)
+    return df[TRANS_COLS + TRANS_DERIVED_COLS]
 
 
+# ✅ Lista de pessoas quase nunca muda: cache longo (gravação em pessoas.json invalida)
+@_leitor_de(fin_path("pessoas"))
+@st.cache_data(ttl=3600, max_entries=1, show_spinner=False)
 def buscar_pessoas() -> List[str]:
     obj, _ = gh_get_file(fin_path("pessoas"))
+    return _lista_pessoas(obj)
+
+
+def _lista_pessoas(obj: Any) -> List[str]:
     if obj and isinstance(obj, list):
-        nomes = [n for n in obj if str(n).strip().lower() != "ambos"]
+        nomes = [n for n in obj if n and str(n).strip().casefold() != "ambos"]
         return nomes + ["Ambos"]
     return ["Guilherme", "Alynne", "Ambos"]
 
 
+@_leitor_de(fin_path("transacoes"))
+@st.cache_data(ttl=60, show_spinner=False)
 def buscar_dados() -> pd.DataFrame:
     obj, _ = gh_get_file(fin_path("transacoes"))
+    return _df_transacoes(obj)
+
+
+def _df_transacoes(obj: Any) -> pd.DataFrame:
     if not obj:
-        return pd.DataFrame(columns=TRANS_COLS)
-    df = pd.DataFrame(obj)
+        return pd.DataFrame(columns=TRANS_COLS + TRANS_DERIVED_COLS)
+    # ✅ Só as colunas usadas: chaves extras dos registros não viram colunas/objetos
+    df = pd.DataFrame(obj, columns=TRANS_COLS)
     return _normalize_transacoes_df(df)
 
 
-def inserir_transacao(reg: Dict[str, Any]) -> None:
-    def updater(obj):
-        obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
-        reg2 = dict(reg)
-        reg2['id'] = new_id
-        obj.append(reg2)
-        return obj
-    safe_update_json(fin_path("transacoes"), updater, commit_message="add transacao")
+def anexar_transacao(df: pd.DataFrame, reg: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Acrescenta ao DataFrame da sessão um registro já gravado (retorno de inserir_transacao),
+    evitando reler o arquivo inteiro do GitHub só para ver 1 linha nova.
+    """
+    novo = _normalize_transacoes_df(pd.DataFrame([reg], columns=TRANS_COLS))
+    if df.empty:
+        return novo
+    out = pd.concat([df, novo], ignore_index=True)
+    for c in TRANS_CAT_COLS:
+        out[c] = out[c].astype('category')  # concat de categorias diferentes vira object
+    return out.sort_values('data', ascending=False, kind='stable', na_position='last', ignore_index=True)
+
+
+def inserir_transacao(reg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Insere e retorna o registro gravado (com id), ou None se falhou.
+    """
+    updater = functools.partial(_list_insert, reg=reg)
+    new_obj, _sha = safe_update_json(fin_path("transacoes"), updater, commit_message="add transacao")
+    return new_obj[-1] if new_obj else None
 
 
 def atualizar_transacao(trans_id: int, patch: Dict[str, Any]) -> None:
-    def updater(obj):
-        obj = obj or []
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(trans_id):
-                r.update(dict(patch))
-        return obj
+    updater = functools.partial(_list_update, rec_id=trans_id, patch=dict(patch))
     safe_update_json(fin_path("transacoes"), updater, commit_message=f"update transacao {trans_id}")
 
 
 def deletar_transacao(trans_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(trans_id))]
+    updater = functools.partial(_list_delete, rec_id=trans_id)
     safe_update_json(fin_path("transacoes"), updater, commit_message=f"delete transacao {trans_id}")
 
 
+@_leitor_de(fin_path("metas"))
+@st.cache_data(ttl=300, max_entries=1, show_spinner=False)  # upsert_meta invalida via safe_update_json
 def buscar_metas() -> Dict[str, float]:
     obj, _ = gh_get_file(fin_path("metas"))
     return obj if isinstance(obj, dict) else {}
@@ -253,8 +879,14 @@ def upsert_meta(categoria: str, limite: float) -> None:
     safe_update_json(fin_path("metas"), updater, commit_message=f"upsert meta {categoria}")
 
 
+@_leitor_de(fin_path("fixos"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_fixos() -> pd.DataFrame:
     obj, _ = gh_get_file(fin_path("fixos"))
+    return _df_fixos(obj)
+
+
+def _df_fixos(obj: Any) -> pd.DataFrame:
     if not obj:
         return pd.DataFrame(columns=['id', 'descricao', 'valor', 'categoria', 'responsavel'])
     df = pd.DataFrame(obj)
@@ -264,31 +896,54 @@ def buscar_fixos() -> pd.DataFrame:
     return df
 
 
+# ✅ Sincronização inicial da aba: os 4 arquivos num único POST GraphQL (1 RTT em vez de 4)
+@_leitor_de(fin_path("transacoes"))
+@_leitor_de(fin_path("metas"))
+@_leitor_de(fin_path("fixos"))
+@_leitor_de(fin_path("pessoas"))
+@st.cache_data(ttl=60, show_spinner=False)
+def carregar_financeiro() -> Tuple[pd.DataFrame, Dict[str, float], pd.DataFrame, List[str]]:
+    """
+    Retorna (dados, metas, fixos, pessoas) — mesmo resultado de buscar_dados/
+    buscar_metas/buscar_fixos/buscar_pessoas, lidos em lote via gh_batch_get.
+    """
+    p_trans, p_metas, p_fixos, p_pessoas = (
+        fin_path("transacoes"), fin_path("metas"), fin_path("fixos"), fin_path("pessoas")
+    )
+    got = gh_batch_get([p_trans, p_metas, p_fixos, p_pessoas])
+    metas = got[p_metas][0]
+    return (
+        _df_transacoes(got[p_trans][0]),
+        metas if isinstance(metas, dict) else {},
+        _df_fixos(got[p_fixos][0]),
+        _lista_pessoas(got[p_pessoas][0]),
+    )
+
+
 def inserir_fixo(reg: Dict[str, Any]) -> None:
-    def updater(obj):
-        obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
-        reg2 = dict(reg)
-        reg2['id'] = new_id
-        obj.append(reg2)
-        return obj
+    updater = functools.partial(_list_insert, reg=reg)
     safe_update_json(fin_path("fixos"), updater, commit_message="add fixo")
 
 
+def inserir_transacao_com_fixo(reg: Dict[str, Any], fixo: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Lança a transação e já salva o fixo num único commit (gh_commit_multi),
+    no lugar de 2 commits seguidos. Retorna a transação gravada (com id) ou None.
+    """
+    with batch_writes("add transacao + fixo") as lote:
+        inserir_transacao(reg)
+        inserir_fixo(fixo)
+    trans = (lote.result or {}).get(fin_path("transacoes"))
+    return trans[-1] if trans else None
+
+
 def atualizar_fixo(fixo_id: int, patch: Dict[str, Any]) -> None:
-    def updater(obj):
-        obj = obj or []
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(fixo_id):
-                r.update(dict(patch))
-        return obj
+    updater = functools.partial(_list_update, rec_id=fixo_id, patch=dict(patch))
     safe_update_json(fin_path("fixos"), updater, commit_message=f"update fixo {fixo_id}")
 
 
 def deletar_fixo(fixo_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(fixo_id))]
+    updater = functools.partial(_list_delete, rec_id=fixo_id)
     safe_update_json(fin_path("fixos"), updater, commit_message=f"delete fixo {fixo_id}")
 
 
@@ -331,15 +986,27 @@ def _normalize_task_row(r: Dict[str, Any]) -> Dict[str, Any]:
     return rr
 
 
+@_leitor_de(tasks_path("tasks"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_tasks() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(tasks_path("tasks"))
+    return _parse_tasks(obj)
+
+
+def _parse_tasks(obj: Any) -> List[Dict[str, Any]]:
     if not obj or not isinstance(obj, list):
         return []
-    out: List[Dict[str, Any]] = []
-    for r in obj:
-        if isinstance(r, dict) and r.get("id") is not None:
-            out.append(_normalize_task_row(r))
-    return out
+    return [_normalize_task_row(r) for r in obj if r.get("id") is not None]
+
+
+# ✅ Estado inicial da aba Tarefas: tasks + pessoas juntos (no lugar de 2 GETs em série)
+@_leitor_de(tasks_path("tasks"))
+@_leitor_de(fin_path("pessoas"))
+@st.cache_data(ttl=30, show_spinner=False)
+def carregar_tarefas() -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Mesmo resultado de (buscar_tasks(), buscar_pessoas()), lidos em lote."""
+    lote = gh_batch_get([tasks_path("tasks"), fin_path("pessoas")])
+    return _parse_tasks(lote[tasks_path("tasks")][0]), _lista_pessoas(lote[fin_path("pessoas")][0])
 
 
 def inserir_task(reg: Dict[str, Any]) -> bool:
@@ -350,17 +1017,7 @@ def inserir_task(reg: Dict[str, Any]) -> bool:
     def updater(obj):
         obj = obj if isinstance(obj, list) else []
 
-        # IDs robustos (ignora inválidos)
-        ids = []
-        for r in obj:
-            if not isinstance(r, dict):
-                continue
-            try:
-                ids.append(int(r.get("id") or 0))
-            except Exception:
-                pass
-
-        new_id = (max(ids) + 1) if ids else 1
+        new_id = _next_id(obj)  # ignora IDs inválidos de registros antigos
 
         reg2 = dict(reg)
         reg2["id"] = new_id
@@ -389,13 +1046,7 @@ def atualizar_task(task_id: int, patch: Dict[str, Any]) -> bool:
     """
     Atualiza tarefa e retorna True se gravou.
     """
-    def updater(obj):
-        obj = obj if isinstance(obj, list) else []
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(task_id):
-                r.update(dict(patch))
-        return obj
-
+    updater = functools.partial(_list_update, rec_id=task_id, patch=dict(patch))
     _obj, new_sha = safe_update_json(tasks_path("tasks"), updater, commit_message=f"update task {task_id}")
     return bool(new_sha)
 
@@ -404,10 +1055,7 @@ def deletar_task(task_id: int) -> bool:
     """
     Delete mais responsivo (menos retries e delay menor) e retorna bool.
     """
-    def updater(obj):
-        obj = obj if isinstance(obj, list) else []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(task_id))]
-
+    updater = functools.partial(_list_delete, rec_id=task_id)
     _obj, new_sha = safe_update_json(
         tasks_path("tasks"),
         updater,
@@ -422,12 +1070,7 @@ def deletar_tasks_bulk(task_ids: list[int]) -> bool:
     Remove várias tarefas em um único commit (1 GET + 1 PUT).
     Ideal para fila _pending_deletes no mobile.
     """
-    ids_set = set()
-    for x in (task_ids or []):
-        try:
-            ids_set.add(int(x))
-        except Exception:
-            pass
+    ids_set = {i for i in map(_to_int_or_none, task_ids or []) if i is not None}
 
     if not ids_set:
         return True
@@ -436,13 +1079,8 @@ def deletar_tasks_bulk(task_ids: list[int]) -> bool:
         obj = obj if isinstance(obj, list) else []
         out = []
         for r in obj:
-            if not isinstance(r, dict):
-                continue
-            try:
-                rid = int(r.get("id", -1))
-            except Exception:
-                continue
-            if rid not in ids_set:
+            rid = _to_int_or_none(r.get("id", -1))
+            if rid is not None and rid not in ids_set:
                 out.append(r)
         return out
 
@@ -478,24 +1116,20 @@ def _ensure_recurrence_dict_or_none(value: Any) -> Optional[dict]:
     return None
 
 
+@_leitor_de(saude_path("habits"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_habitos() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(saude_path("habits"))
     if not obj or not isinstance(obj, list):
         return []
     out = []
     for r in obj:
-        if not isinstance(r, dict):
-            continue
         rr = dict(r)
-        try:
-            rid = int(rr.get("id"))
-        except Exception:
+        rid = _to_int_or_none(rr.get("id"))
+        if rid is None:
             continue
-        name = (rr.get("name") or "").strip()
-        try:
-            tgt = int(rr.get("target_per_day", 0) or 0)
-        except Exception:
-            tgt = 0
+        name = _s(rr.get("name"))
+        tgt = _to_int_or_none(rr.get("target_per_day", 0) or 0) or 0
         unit = rr.get("unit") or ""
         rec = _ensure_recurrence_dict_or_none(rr.get("recurrence"))
         out.append({"id": rid, "name": name, "target_per_day": tgt, "unit": unit, "recurrence": rec})
@@ -505,13 +1139,10 @@ def buscar_habitos() -> List[Dict[str, Any]]:
 def inserir_habito(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
-        name = (reg.get("name") or "").strip()
+        new_id = _next_id(obj)
+        name = _s(reg.get("name"))
         unit = (reg.get("unit") or "")
-        try:
-            target = int(reg.get("target_per_day", 0) or 0)
-        except Exception:
-            target = 0
+        target = _to_int_or_none(reg.get("target_per_day", 0) or 0) or 0
         recurrence = _ensure_recurrence_dict_or_none(reg.get("recurrence"))
         obj.append({"id": new_id, "name": name, "unit": unit, "target_per_day": target, "recurrence": recurrence})
         return obj
@@ -521,70 +1152,43 @@ def inserir_habito(reg: Dict[str, Any]) -> None:
 def atualizar_habito(habit_id: int, patch: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        out = []
-        for r in obj:
-            if not isinstance(r, dict):
-                continue
-            rid = int(r.get("id", -1)) if r.get("id") is not None else -1
-            if rid == int(habit_id):
-                rr = dict(r)
-                if "name" in patch:
-                    rr["name"] = (patch.get("name") or "").strip()
-                if "unit" in patch:
-                    rr["unit"] = (patch.get("unit") or "")
-                if "target_per_day" in patch:
-                    try:
-                        rr["target_per_day"] = int(patch.get("target_per_day", 0) or 0)
-                    except Exception:
-                        rr["target_per_day"] = 0
-                if "recurrence" in patch:
-                    rr["recurrence"] = _ensure_recurrence_dict_or_none(patch.get("recurrence"))
-                rr.setdefault("target_per_day", 0)
-                rr.setdefault("unit", "")
-                rr.setdefault("recurrence", None)
-                out.append(rr)
-            else:
-                out.append(r)
-        return out
+        for i in _find_idxs(obj, habit_id):
+            rr = dict(obj[i])
+            if "name" in patch:
+                rr["name"] = _s(patch.get("name"))
+            if "unit" in patch:
+                rr["unit"] = (patch.get("unit") or "")
+            if "target_per_day" in patch:
+                rr["target_per_day"] = _to_int_or_none(patch.get("target_per_day", 0) or 0) or 0
+            if "recurrence" in patch:
+                rr["recurrence"] = _ensure_recurrence_dict_or_none(patch.get("recurrence"))
+            rr.setdefault("target_per_day", 0)
+            rr.setdefault("unit", "")
+            rr.setdefault("recurrence", None)
+            obj[i] = rr
+        return obj
     safe_update_json(saude_path("habits"), updater, commit_message=f"update habit {habit_id}")
 
 
 def deletar_habito(habit_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(habit_id))]
+    updater = functools.partial(_list_delete, rec_id=habit_id)
     safe_update_json(saude_path("habits"), updater, commit_message=f"delete habit {habit_id}")
 
 
+@_leitor_de(saude_path("habit_logs"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_habit_logs() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(saude_path("habit_logs"))
-    if not obj or not isinstance(obj, list):
-        return []
-    out = []
-    for r in obj:
-        if not isinstance(r, dict):
-            continue
-        try:
-            log_id = int(r.get("id"))
-            habit_id = int(r.get("habit_id"))
-        except Exception:
-            continue
-        date_str = r.get("date")
-        try:
-            amount = float(r.get("amount", 0) or 0)
-        except Exception:
-            amount = 0.0
-        out.append({"id": log_id, "habit_id": habit_id, "date": date_str, "amount": amount})
-    return out
+    return _coerce_rows(obj, {"id": "int", "habit_id": "int", "date": "raw", "amount": "float0"},
+                        required=("id", "habit_id"))
 
 
 def inserir_habit_log(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
-        try:
-            habit_id = int(reg.get("habit_id"))
-        except Exception:
+        new_id = _next_id(obj)
+        habit_id = _to_int_or_none(reg.get("habit_id"))
+        if habit_id is None:
             raise ValueError("habit_id inválido")
         date_str = reg.get("date")
         try:
@@ -599,78 +1203,58 @@ def inserir_habit_log(reg: Dict[str, Any]) -> None:
 def atualizar_habit_log(log_id: int, patch: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        out = []
-        for r in obj:
-            if not isinstance(r, dict):
-                continue
-            rid = int(r.get("id", -1)) if r.get("id") is not None else -1
-            if rid == int(log_id):
-                rr = dict(r)
-                if "habit_id" in patch:
-                    try:
-                        rr["habit_id"] = int(patch.get("habit_id"))
-                    except Exception:
-                        pass
-                if "date" in patch:
-                    rr["date"] = patch.get("date")
-                if "amount" in patch:
-                    try:
-                        rr["amount"] = float(patch.get("amount", 0) or 0)
-                    except Exception:
-                        rr["amount"] = 0.0
-                out.append(rr)
-            else:
-                out.append(r)
-        return out
+        for i in _find_idxs(obj, log_id):
+            rr = dict(obj[i])
+            if "habit_id" in patch:
+                hid = _to_int_or_none(patch.get("habit_id"))
+                if hid is not None:
+                    rr["habit_id"] = hid
+            if "date" in patch:
+                rr["date"] = patch.get("date")
+            if "amount" in patch:
+                try:
+                    rr["amount"] = float(patch.get("amount", 0) or 0)
+                except Exception:
+                    rr["amount"] = 0.0
+            obj[i] = rr
+        return obj
     safe_update_json(saude_path("habit_logs"), updater, commit_message=f"update habit_log {log_id}")
 
 
 def deletar_habit_log(log_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(log_id))]
+    updater = functools.partial(_list_delete, rec_id=log_id)
     safe_update_json(saude_path("habit_logs"), updater, commit_message=f"delete habit_log {log_id}")
 
 
 # =================================================
 #          SAÚDE (NOVA): PESO / ÁGUA / TREINOS / CONFIG
 # =================================================
+@_leitor_de(saude_path("weight_logs"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_peso_logs() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(saude_path("weight_logs"))
-    if not obj or not isinstance(obj, list):
-        return []
-    out = []
-    for r in obj:
-        if not isinstance(r, dict):
-            continue
-        try:
-            rid = int(r.get("id"))
-            w = float(r.get("weight_kg"))
-        except Exception:
-            continue
-        out.append({
-            "id": rid,
-            "date": r.get("date"),
-            "weight_kg": w,
-            "body_fat_pct": float(r.get("body_fat_pct")) if r.get("body_fat_pct") not in (None, "") else None,
-            "waist_cm": float(r.get("waist_cm")) if r.get("waist_cm") not in (None, "") else None,
-        })
-    return out
+    return _parse_peso_logs(obj)
+
+
+def _parse_peso_logs(obj: Any) -> List[Dict[str, Any]]:
+    return _coerce_rows(obj, {"id": "int", "date": "raw", "weight_kg": "float",
+                              "body_fat_pct": "float", "waist_cm": "float"},
+                        required=("id", "weight_kg"))
 
 
 def inserir_peso(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(x.get("id", 0)) for x in obj if isinstance(x, dict)]) + 1) if obj else 1
+        new_id = _next_id(obj)
         date_str = str(reg.get("date"))
         w = float(reg.get("weight_kg"))
-        bf = reg.get("body_fat_pct")
-        wc = reg.get("waist_cm")
+        bf = _opt_float(reg.get("body_fat_pct"))
+        wc = _opt_float(reg.get("waist_cm"))
         row = {"id": new_id, "date": date_str, "weight_kg": w}
-        if bf not in (None, ""):
-            row["body_fat_pct"] = float(bf)
-        if wc not in (None, ""):
-            row["waist_cm"] = float(wc)
+        if bf is not None:
+            row["body_fat_pct"] = bf
+        if wc is not None:
+            row["waist_cm"] = wc
         obj.append(row)
         return obj
     safe_update_json(saude_path("weight_logs"), updater, commit_message="add weight_log")
@@ -679,48 +1263,41 @@ def inserir_peso(reg: Dict[str, Any]) -> None:
 def atualizar_peso(log_id: int, patch: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(log_id):
-                if "date" in patch and patch["date"]:
-                    r["date"] = str(patch["date"])
-                if "weight_kg" in patch:
-                    r["weight_kg"] = float(patch["weight_kg"])
-                if "body_fat_pct" in patch:
-                    r["body_fat_pct"] = float(patch["body_fat_pct"]) if patch["body_fat_pct"] not in (None, "") else None
-                if "waist_cm" in patch:
-                    r["waist_cm"] = float(patch["waist_cm"]) if patch["waist_cm"] not in (None, "") else None
+        for i in _find_idxs(obj, log_id):
+            r = obj[i]
+            if "date" in patch and patch["date"]:
+                r["date"] = str(patch["date"])
+            if "weight_kg" in patch:
+                r["weight_kg"] = float(patch["weight_kg"])
+            if "body_fat_pct" in patch:
+                r["body_fat_pct"] = _opt_float(patch["body_fat_pct"])
+            if "waist_cm" in patch:
+                r["waist_cm"] = _opt_float(patch["waist_cm"])
         return obj
     safe_update_json(saude_path("weight_logs"), updater, commit_message=f"update weight_log {log_id}")
 
 
 def deletar_peso(log_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(log_id))]
+    updater = functools.partial(_list_delete, rec_id=log_id)
     safe_update_json(saude_path("weight_logs"), updater, commit_message=f"delete weight_log {log_id}")
 
 
+@_leitor_de(saude_path("water_logs"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_agua_logs() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(saude_path("water_logs"))
-    if not obj or not isinstance(obj, list):
-        return []
-    out = []
-    for r in obj:
-        if not isinstance(r, dict):
-            continue
-        try:
-            rid = int(r.get("id"))
-            amt = float(r.get("amount_ml"))
-        except Exception:
-            continue
-        out.append({"id": rid, "date": r.get("date"), "amount_ml": amt})
-    return out
+    return _parse_agua_logs(obj)
+
+
+def _parse_agua_logs(obj: Any) -> List[Dict[str, Any]]:
+    return _coerce_rows(obj, {"id": "int", "date": "raw", "amount_ml": "float"},
+                        required=("id", "amount_ml"))
 
 
 def inserir_agua(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(x.get("id", 0)) for x in obj if isinstance(x, dict)]) + 1) if obj else 1
+        new_id = _next_id(obj)
         date_str = str(reg.get("date"))
         amt = float(reg.get("amount_ml"))
         obj.append({"id": new_id, "date": date_str, "amount_ml": amt})
@@ -731,23 +1308,23 @@ def inserir_agua(reg: Dict[str, Any]) -> None:
 def atualizar_agua(log_id: int, patch: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(log_id):
-                if "date" in patch and patch["date"]:
-                    r["date"] = str(patch["date"])
-                if "amount_ml" in patch:
-                    r["amount_ml"] = float(patch["amount_ml"])
+        for i in _find_idxs(obj, log_id):
+            r = obj[i]
+            if "date" in patch and patch["date"]:
+                r["date"] = str(patch["date"])
+            if "amount_ml" in patch:
+                r["amount_ml"] = float(patch["amount_ml"])
         return obj
     safe_update_json(saude_path("water_logs"), updater, commit_message=f"update water_log {log_id}")
 
 
 def deletar_agua(log_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(log_id))]
+    updater = functools.partial(_list_delete, rec_id=log_id)
     safe_update_json(saude_path("water_logs"), updater, commit_message=f"delete water_log {log_id}")
 
 
+@_leitor_de(saude_path("saude_config"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_saude_config() -> Dict[str, Any]:
     obj, _ = gh_get_file(saude_path("saude_config"))
     return obj if isinstance(obj, dict) else {}
@@ -763,46 +1340,34 @@ def upsert_saude_config(patch: Dict[str, Any]) -> None:
     safe_update_json(saude_path("saude_config"), updater, commit_message="upsert saude_config")
 
 
+@_leitor_de(saude_path("workout_logs"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_workout_logs() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(saude_path("workout_logs"))
-    if not obj or not isinstance(obj, list):
-        return []
-    out = []
-    for r in obj:
-        if not isinstance(r, dict):
-            continue
-        try:
-            rid = int(r.get("id"))
-            reps = int(r.get("reps"))
-            w = float(r.get("weight_kg") or 0.0)
-        except Exception:
-            continue
-        out.append({
-            "id": rid,
-            "date": r.get("date"),
-            "exercise": (r.get("exercise") or "").strip(),
-            "reps": reps,
-            "weight_kg": w,
-            "rpe": float(r.get("rpe")) if r.get("rpe") not in (None, "") else None,
-            "notes": r.get("notes") or ""
-        })
-    return out
+    return _parse_workout_logs(obj)
+
+
+def _parse_workout_logs(obj: Any) -> List[Dict[str, Any]]:
+    return _coerce_rows(obj, {"id": "int", "date": "raw", "exercise": "str", "reps": "int",
+                              "weight_kg": "float0", "rpe": "float", "notes": "str"},
+                        required=("id", "reps"))
 
 
 def inserir_workout_log(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(x.get("id", 0)) for x in obj if isinstance(x, dict)]) + 1) if obj else 1
+        new_id = _next_id(obj)
         row = {
             "id": new_id,
             "date": str(reg.get("date")),
-            "exercise": (reg.get("exercise") or "").strip(),
+            "exercise": _s(reg.get("exercise")),
             "reps": int(reg.get("reps")),
             "weight_kg": float(reg.get("weight_kg") or 0.0),
-            "notes": (reg.get("notes") or "").strip()
+            "notes": _s(reg.get("notes"))
         }
-        if reg.get("rpe") not in (None, ""):
-            row["rpe"] = float(reg.get("rpe"))
+        rpe = _opt_float(reg.get("rpe"))
+        if rpe is not None:
+            row["rpe"] = rpe
         obj.append(row)
         return obj
     safe_update_json(saude_path("workout_logs"), updater, commit_message="add workout_log")
@@ -811,28 +1376,26 @@ def inserir_workout_log(reg: Dict[str, Any]) -> None:
 def atualizar_workout_log(log_id: int, patch: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(log_id):
-                if "date" in patch and patch["date"]:
-                    r["date"] = str(patch["date"])
-                if "exercise" in patch:
-                    r["exercise"] = (patch["exercise"] or "").strip()
-                if "reps" in patch:
-                    r["reps"] = int(patch["reps"])
-                if "weight_kg" in patch:
-                    r["weight_kg"] = float(patch["weight_kg"])
-                if "rpe" in patch:
-                    r["rpe"] = float(patch["rpe"]) if patch["rpe"] not in (None, "") else None
-                if "notes" in patch:
-                    r["notes"] = (patch["notes"] or "").strip()
+        for i in _find_idxs(obj, log_id):
+            r = obj[i]
+            if "date" in patch and patch["date"]:
+                r["date"] = str(patch["date"])
+            if "exercise" in patch:
+                r["exercise"] = _s(patch["exercise"])
+            if "reps" in patch:
+                r["reps"] = int(patch["reps"])
+            if "weight_kg" in patch:
+                r["weight_kg"] = float(patch["weight_kg"])
+            if "rpe" in patch:
+                r["rpe"] = _opt_float(patch["rpe"])
+            if "notes" in patch:
+                r["notes"] = _s(patch["notes"])
         return obj
     safe_update_json(saude_path("workout_logs"), updater, commit_message=f"update workout_log {log_id}")
 
 
 def deletar_workout_log(log_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(log_id))]
+    updater = functools.partial(_list_delete, rec_id=log_id)
     safe_update_json(saude_path("workout_logs"), updater, commit_message=f"delete workout_log {log_id}")
 
 
@@ -840,33 +1403,54 @@ def deletar_workout_log(log_id: int) -> None:
 #            ESTUDOS (NOVO - SIMPLES + ESTÍMULO)
 #   subjects.json | topics.json | study_logs.json
 # =================================================
+@_leitor_de(estudos_path("subjects"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_estudos_subjects() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(estudos_path("subjects"))
     return obj if isinstance(obj, list) else []
 
 
+@_leitor_de(estudos_path("topics"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_estudos_topics() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(estudos_path("topics"))
     return obj if isinstance(obj, list) else []
 
 
+@_leitor_de(estudos_path("study_logs"))
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_estudos_logs() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(estudos_path("study_logs"))
     return obj if isinstance(obj, list) else []
 
 
+# ✅ Estado inicial da aba Estudos: 3 arquivos numa única requisição (gh_batch_get)
+@_leitor_de(estudos_path("subjects"))
+@_leitor_de(estudos_path("topics"))
+@_leitor_de(estudos_path("study_logs"))
+@st.cache_data(ttl=30, show_spinner=False)
+def carregar_estudos() -> Dict[str, List[Dict[str, Any]]]:
+    """Mesmo resultado dos buscar_estudos_*, lidos em lote. Chaves: subjects, topics, logs."""
+    p = {
+        "subjects": estudos_path("subjects"),
+        "topics": estudos_path("topics"),
+        "logs": estudos_path("study_logs"),
+    }
+    lote = gh_batch_get(list(p.values()))
+    return {k: (lote[path][0] if isinstance(lote[path][0], list) else []) for k, path in p.items()}
+
+
 def inserir_estudos_subject(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
+        new_id = _next_id(obj)
 
-        name = (reg.get("name") or "").strip()
+        name = _s(reg.get("name"))
         if not name:
             raise ValueError("name inválido")
 
-        try:
-            order = int(reg.get("order", len(obj) + 1) or (len(obj) + 1))
-        except Exception:
+        order = _to_int_or_none(reg.get("order", len(obj) + 1) or (len(obj) + 1))
+        if order is None:
             order = len(obj) + 1
 
         obj.append({"id": new_id, "name": name, "order": order})
@@ -878,56 +1462,58 @@ def inserir_estudos_subject(reg: Dict[str, Any]) -> None:
 def atualizar_estudos_subject(subject_id: int, patch: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(subject_id):
-                if "name" in patch:
-                    r["name"] = (patch.get("name") or "").strip()
-                if "order" in patch:
-                    try:
-                        r["order"] = int(patch.get("order"))
-                    except Exception:
-                        pass
+        for i in _find_idxs(obj, subject_id):
+            r = obj[i]
+            if "name" in patch:
+                r["name"] = _s(patch.get("name"))
+            if "order" in patch:
+                order = _to_int_or_none(patch.get("order"))
+                if order is not None:
+                    r["order"] = order
         return obj
 
     safe_update_json(estudos_path("subjects"), updater, commit_message=f"update estudos subject {subject_id}")
 
 
 def deletar_estudos_subject(subject_id: int) -> None:
-    def upd_sub(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(subject_id))]
+    upd_sub = functools.partial(_list_delete, rec_id=subject_id)
 
-    safe_update_json(estudos_path("subjects"), upd_sub, commit_message=f"delete estudos subject {subject_id}")
+    sid = int(subject_id)
 
     def upd_topics(obj):
         obj = obj or []
-        return [t for t in obj if not (isinstance(t, dict) and int(t.get("subject_id", -1)) == int(subject_id))]
+        # subject_id malformado não casa com sid: tópico fica (e o commit não aborta)
+        return [t for t in obj if _to_int_or_none(t.get("subject_id", -1)) != sid]
 
-    safe_update_json(estudos_path("topics"), upd_topics, commit_message=f"delete topics from subject {subject_id}")
+    # ✅ Matéria + tópicos num único commit: nunca fica tópico órfão entre os dois PUTs
+    gh_commit_multi(
+        {estudos_path("subjects"): upd_sub, estudos_path("topics"): upd_topics},
+        commit_message=f"delete estudos subject {subject_id} (+ topics)"
+    )
 
 
 def inserir_estudos_topic(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
+        new_id = _next_id(obj)
         now = datetime.utcnow().isoformat() + "Z"
 
-        try:
-            subject_id = int(reg.get("subject_id"))
-        except Exception:
+        subject_id = _to_int_or_none(reg.get("subject_id"))
+        if subject_id is None:
             raise ValueError("subject_id inválido")
 
-        title = (reg.get("title") or "").strip()
+        title = _s(reg.get("title"))
         if not title:
             raise ValueError("title inválido")
 
-        try:
-            default_order = 1
-            same = [x for x in obj if isinstance(x, dict) and int(x.get("subject_id", -1)) == subject_id]
-            if same:
-                default_order = max([int(x.get("order", 0) or 0) for x in same]) + 1
-            order = int(reg.get("order", default_order) or default_order)
-        except Exception:
+        # 1 passada, sem lista intermediária dos tópicos da matéria; order malformado conta como 0
+        default_order = max(
+            (_to_int_or_none(x.get("order", 0) or 0) or 0 for x in obj
+             if _to_int_or_none(x.get("subject_id", -1)) == subject_id),
+            default=0,
+        ) + 1
+        order = _to_int_or_none(reg.get("order", default_order) or default_order)
+        if order is None:
             order = 9999
 
         status = (reg.get("status") or "todo").strip()
@@ -941,12 +1527,9 @@ def inserir_estudos_topic(reg: Dict[str, Any]) -> None:
             planned_weekdays = []
         wk: List[int] = []
         for v in planned_weekdays:
-            try:
-                iv = int(v)
-                if 0 <= iv <= 6:
-                    wk.append(iv)
-            except Exception:
-                pass
+            iv = _to_int_or_none(v)
+            if iv is not None and 0 <= iv <= 6:
+                wk.append(iv)
 
         row = {
             "id": new_id,
@@ -975,35 +1558,31 @@ def atualizar_estudos_topic(topic_id: int, patch: Dict[str, Any]) -> None:
         obj = obj or []
         now = datetime.utcnow().isoformat() + "Z"
 
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(topic_id):
-                for k, v in patch.items():
-                    if k == "status":
-                        vv = (v or "").strip()
-                        if vv in ("todo", "doing", "done"):
-                            r[k] = vv
-                    elif k == "planned_weekdays":
-                        lst = v if isinstance(v, list) else []
-                        wk: List[int] = []
-                        for x in lst:
-                            try:
-                                ix = int(x)
-                                if 0 <= ix <= 6:
-                                    wk.append(ix)
-                            except Exception:
-                                pass
-                        r[k] = wk
-                    elif k in ("order", "subject_id"):
-                        try:
-                            r[k] = int(v)
-                        except Exception:
-                            pass
-                    elif k in ("review", "active"):
-                        r[k] = bool(v)
-                    else:
-                        r[k] = v
-
-                r["updated_at"] = now
+        for i in _find_idxs(obj, topic_id):
+            r = obj[i]
+            for k, v in patch.items():
+                if k == "status":
+                    vv = _s(v)
+                    if vv in ("todo", "doing", "done"):
+                        r[k] = vv
+                elif k == "planned_weekdays":
+                    lst = v if isinstance(v, list) else []
+                    wk: List[int] = []
+                    for x in lst:
+                        ix = _to_int_or_none(x)
+                        if ix is not None and 0 <= ix <= 6:
+                            wk.append(ix)
+                    r[k] = wk
+                elif k in ("order", "subject_id"):
+                    iv = _to_int_or_none(v)
+                    if iv is not None:
+                        r[k] = iv
+                elif k in ("review", "active"):
+                    r[k] = bool(v)
+                else:
+                    r[k] = v
+
+            r["updated_at"] = now
 
         return obj
 
@@ -1011,28 +1590,20 @@ def atualizar_estudos_topic(topic_id: int, patch: Dict[str, Any]) -> None:
 
 
 def deletar_estudos_topic(topic_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(topic_id))]
-
+    updater = functools.partial(_list_delete, rec_id=topic_id)
     safe_update_json(estudos_path("topics"), updater, commit_message=f"delete estudos topic {topic_id}")
 
 
 def inserir_estudos_log(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
+        new_id = _next_id(obj)
 
-        try:
-            topic_id = int(reg.get("topic_id"))
-        except Exception:
+        topic_id = _to_int_or_none(reg.get("topic_id"))
+        if topic_id is None:
             raise ValueError("topic_id inválido")
 
-        duration = reg.get("duration_min", 0)
-        try:
-            duration = int(duration)
-        except Exception:
-            duration = 0
+        duration = _to_int_or_none(reg.get("duration_min", 0)) or 0
         if duration < 0:
             duration = 0
 
@@ -1075,6 +1646,8 @@ def saude_activity_path() -> str:
     return saude_path("activity_logs")
 
 
+@_leitor_de(saude_profile_path())
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_saude_profile() -> Dict[str, Any]:
     obj, _ = gh_get_file(saude_profile_path())
     return obj if isinstance(obj, dict) else {}
@@ -1089,6 +1662,8 @@ def upsert_saude_profile(patch: Dict[str, Any]) -> None:
     safe_update_json(saude_profile_path(), updater, commit_message="upsert saude profile")
 
 
+@_leitor_de(saude_meals_path())
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_meals() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(saude_meals_path())
     return obj if isinstance(obj, list) else []
@@ -1097,13 +1672,13 @@ def buscar_meals() -> List[Dict[str, Any]]:
 def inserir_meal(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
+        new_id = _next_id(obj)
         row = {
             "id": new_id,
             "date": str(reg.get("date")),
-            "meal": (reg.get("meal") or "").strip(),
-            "quality": (reg.get("quality") or "").strip(),
-            "notes": (reg.get("notes") or "").strip()
+            "meal": _s(reg.get("meal")),
+            "quality": _s(reg.get("quality")),
+            "notes": _s(reg.get("notes"))
         }
         obj.append(row)
         return obj
@@ -1111,59 +1686,106 @@ def inserir_meal(reg: Dict[str, Any]) -> None:
 
 
 def atualizar_meal(meal_id: int, patch: Dict[str, Any]) -> None:
-    def updater(obj):
-        obj = obj or []
-        for r in obj:
-            if isinstance(r, dict) and int(r.get("id", -1)) == int(meal_id):
-                r.update(dict(patch))
-        return obj
+    updater = functools.partial(_list_update, rec_id=meal_id, patch=dict(patch))
     safe_update_json(saude_meals_path(), updater, commit_message=f"update meal {meal_id}")
 
 
 def deletar_meal(meal_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(meal_id))]
+    updater = functools.partial(_list_delete, rec_id=meal_id)
     safe_update_json(saude_meals_path(), updater, commit_message=f"delete meal {meal_id}")
 
 
+@_leitor_de(saude_habits_path())
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_habit_checks() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(saude_habits_path())
     return obj if isinstance(obj, list) else []
 
 
-def upsert_habit_check(date_str: str, patch: Dict[str, Any]) -> None:
+def upsert_habit_check(
+    date_str: str,
+    patch: Dict[str, Any],
+    background: bool = False,
+    falhas: Optional[List[str]] = None,
+) -> None:
+    """
+    background=True: vai para a fila de gravação (ver enfileirar_update / `falhas`).
+    Síncrono: espera a fila antes, para não passar na frente de um upsert pendente.
+    """
     def updater(obj):
         obj = obj or []
-        found = None
-        for r in obj:
-            if isinstance(r, dict) and str(r.get("date")) == date_str:
-                found = r
-                break
+        # ✅ Check-ins são gravados em ordem de data: o dia procurado (quase sempre hoje)
+        # está no fim da lista, então a busca de trás pra frente para em 1-2 passos
+        found = next((r for r in reversed(obj) if str(r.get("date")) == date_str), None)
         if found is None:
-            new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
+            new_id = _next_id(obj)
             found = {"id": new_id, "date": date_str, "water_done": False, "move_done": False, "sleep_done": False}
             obj.append(found)
 
         found.update(dict(patch))
         return obj
 
+    if background:
+        enfileirar_update(saude_habits_path(), updater, commit_message=f"upsert habit_check {date_str}", falhas=falhas)
+        return
+    aguardar_gravacoes(saude_habits_path())
     safe_update_json(saude_habits_path(), updater, commit_message=f"upsert habit_check {date_str}")
 
 
+@_leitor_de(saude_activity_path())
+@st.cache_data(ttl=30, show_spinner=False)
 def buscar_activity_logs() -> List[Dict[str, Any]]:
     obj, _ = gh_get_file(saude_activity_path())
     return obj if isinstance(obj, list) else []
 
 
+# ✅ Estado inicial da aba Saúde: 8 arquivos numa única requisição (gh_batch_get)
+@_leitor_de(saude_path("saude_config"))
+@_leitor_de(saude_profile_path())
+@_leitor_de(saude_path("weight_logs"))
+@_leitor_de(saude_path("water_logs"))
+@_leitor_de(saude_path("workout_logs"))
+@_leitor_de(saude_meals_path())
+@_leitor_de(saude_habits_path())
+@_leitor_de(saude_activity_path())
+@st.cache_data(ttl=30, show_spinner=False)
+def carregar_saude() -> Dict[str, Any]:
+    """
+    Mesmo resultado dos buscar_* da Saúde, lidos em lote. Chaves: config, profile,
+    peso_logs, agua_logs, workout_logs, meals, habit_checks, activity_logs.
+    """
+    p = {
+        "config": saude_path("saude_config"),
+        "profile": saude_profile_path(),
+        "peso_logs": saude_path("weight_logs"),
+        "agua_logs": saude_path("water_logs"),
+        "workout_logs": saude_path("workout_logs"),
+        "meals": saude_meals_path(),
+        "habit_checks": saude_habits_path(),
+        "activity_logs": saude_activity_path(),
+    }
+    lote = gh_batch_get(list(p.values()))
+    got = {k: lote[path][0] for k, path in p.items()}
+    return {
+        "config": got["config"] if isinstance(got["config"], dict) else {},
+        "profile": got["profile"] if isinstance(got["profile"], dict) else {},
+        "peso_logs": _parse_peso_logs(got["peso_logs"]),
+        "agua_logs": _parse_agua_logs(got["agua_logs"]),
+        "workout_logs": _parse_workout_logs(got["workout_logs"]),
+        "meals": got["meals"] if isinstance(got["meals"], list) else [],
+        "habit_checks": got["habit_checks"] if isinstance(got["habit_checks"], list) else [],
+        "activity_logs": got["activity_logs"] if isinstance(got["activity_logs"], list) else [],
+    }
+
+
 def inserir_activity_log(reg: Dict[str, Any]) -> None:
     def updater(obj):
         obj = obj or []
-        new_id = (max([int(r.get("id", 0)) for r in obj if isinstance(r, dict)]) + 1) if obj else 1
+        new_id = _next_id(obj)
         row = {
             "id": new_id,
             "date": str(reg.get("date")),
-            "activity": (reg.get("activity") or "").strip(),
+            "activity": _s(reg.get("activity")),
             "minutes": int(reg.get("minutes") or 0),
             "intensity": (reg.get("intensity") or "leve").strip()
         }
@@ -1173,7 +1795,55 @@ def inserir_activity_log(reg: Dict[str, Any]) -> None:
 
 
 def deletar_activity_log(log_id: int) -> None:
-    def updater(obj):
-        obj = obj or []
-        return [r for r in obj if not (isinstance(r, dict) and int(r.get("id", -1)) == int(log_id))]
+    updater = functools.partial(_list_delete, rec_id=log_id)
     safe_update_json(saude_activity_path(), updater, commit_message=f"delete activity_log {log_id}")
+
+
+# =================================================
+#                 HOJE (painel do dia)
+# =================================================
+# ✅ Estado inicial da aba Hoje: 9 arquivos de 3 domínios numa única requisição
+@_leitor_de(tasks_path("tasks"))
+@_leitor_de(saude_path("water_logs"))
+@_leitor_de(saude_path("weight_logs"))
+@_leitor_de(saude_activity_path())
+@_leitor_de(saude_path("workout_logs"))
+@_leitor_de(saude_path("saude_config"))
+@_leitor_de(estudos_path("subjects"))
+@_leitor_de(estudos_path("topics"))
+@_leitor_de(estudos_path("study_logs"))
+@st.cache_data(ttl=30, show_spinner=False)
+def carregar_hoje() -> Dict[str, Any]:
+    """
+    Mesmo resultado dos buscar_* usados na aba Hoje, lidos em lote. Chaves: tasks,
+    agua_logs, peso_logs, activity_logs, workout_logs, saude_config, est_subjects,
+    est_topics, est_logs.
+    """
+    p = {
+        "tasks": tasks_path("tasks"),
+        "agua_logs": saude_path("water_logs"),
+        "peso_logs": saude_path("weight_logs"),
+        "activity_logs": saude_activity_path(),
+        "workout_logs": saude_path("workout_logs"),
+        "saude_config": saude_path("saude_config"),
+        "est_subjects": estudos_path("subjects"),
+        "est_topics": estudos_path("topics"),
+        "est_logs": estudos_path("study_logs"),
+    }
+    lote = gh_batch_get(list(p.values()))
+    got = {k: lote[path][0] for k, path in p.items()}
+
+    def lista(v):
+        return v if isinstance(v, list) else []
+
+    return {
+        "tasks": _parse_tasks(got["tasks"]),
+        "agua_logs": _parse_agua_logs(got["agua_logs"]),
+        "peso_logs": _parse_peso_logs(got["peso_logs"]),
+        "activity_logs": lista(got["activity_logs"]),
+        "workout_logs": _parse_workout_logs(got["workout_logs"]),
+        "saude_config": got["saude_config"] if isinstance(got["saude_config"], dict) else {},
+        "est_subjects": lista(got["est_subjects"]),
+        "est_topics": lista(got["est_topics"]),
+        "est_logs": lista(got["est_logs"]),
+    }
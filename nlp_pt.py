@@ -16,6 +16,27 @@ WEEKDAYS = {
 
 TAG_PATTERN = re.compile(r"(?P<tag>#[\w-]+)")
 
+# ✅ Regex compiladas 1x na carga do módulo
+# Dias da semana: 1 alternação (1 varredura) no lugar de 1 busca por chave.
+# Se o texto tiver mais de um dia, vale o que vem primeiro em WEEKDAYS (como antes).
+WEEKDAY_RE = re.compile(r"\b(" + "|".join(map(re.escape, WEEKDAYS)) + r")\b")
+_WEEKDAY_ORDEM = {k: i for i, k in enumerate(WEEKDAYS)}
+
+# Hora: testadas nesta ordem de prioridade (HH:MM, HHh/HHhMM, às HH)
+TIME_HHMM_RE = re.compile(r"(\b\d{1,2}):(\d{2})\b")
+TIME_H_RE = re.compile(r"\b(\d{1,2})h(\d{2})?\b", re.IGNORECASE)
+TIME_AS_RE = re.compile(r"\b(?:às|as)\s*(\d{1,2})(?::(\d{2}))?h?\b", re.IGNORECASE)
+
+DATE_DMY_RE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{4}))?\b")
+EM_DIAS_RE = re.compile(r"\bem\s+(\d{1,2})\s+dias?\b")
+
+# Limpeza do título depois de achar a data
+_DATE_WORDS_RE = re.compile(
+    r"\b(hoje|amanhã|amanha|depois de amanhã|segunda|terça|terca|quarta|quinta|sexta|sábado|sabado|domingo|seg|ter|qua|qui|sex|sab|dom)\b",
+    re.IGNORECASE,
+)
+_DATE_DMY_CLEAN_RE = re.compile(r"\b\d{1,2}/\d{1,2}(?:/\d{4})?\b")
+
 def _next_weekday(base: date, wd: int) -> date:
     delta = (wd - base.weekday()) % 7
     return base + timedelta(days=delta or 7)
@@ -25,19 +46,19 @@ def _extract_time(text: str):
     Padrões: 15h, 15h30, 15:30, às 9h, as 09:05
     """
     # 1) HH:MM
-    m = re.search(r"(\b\d{1,2}):(\d{2})\b", text)
+    m = TIME_HHMM_RE.search(text)
     if m:
         hh = int(m.group(1)); mm = int(m.group(2))
         if 0 <= hh <= 23 and 0 <= mm <= 59:
             return time(hh, mm), m.span()
     # 2) HHhMM ou HHh
-    m = re.search(r"\b(\d{1,2})h(\d{2})?\b", text, re.IGNORECASE)
+    m = TIME_H_RE.search(text)
     if m:
         hh = int(m.group(1)); mm = int(m.group(2) or 0)
         if 0 <= hh <= 23 and 0 <= mm <= 59:
             return time(hh, mm), m.span()
     # 3) às HHh / as HH:MM
-    m = re.search(r"\b(?:às|as)\s*(\d{1,2})(?::(\d{2}))?h?\b", text, re.IGNORECASE)
+    m = TIME_AS_RE.search(text)
     if m:
         hh = int(m.group(1)); mm = int(m.group(2) or 0)
         if 0 <= hh <= 23 and 0 <= mm <= 59:
@@ -53,11 +74,12 @@ def _extract_date(text: str, base: date):
     if 'hoje' in t:
         return base
     # dia da semana
-    for k, wd in WEEKDAYS.items():
-        if re.search(rf"\b{k}\b", t):
-            return _next_weekday(base, wd)
+    achados = WEEKDAY_RE.findall(t)
+    if achados:
+        k = min(achados, key=_WEEKDAY_ORDEM.__getitem__)
+        return _next_weekday(base, WEEKDAYS[k])
     # dd/mm(/yyyy)
-    m = re.search(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{4}))?\b", t)
+    m = DATE_DMY_RE.search(t)
     if m:
         d = int(m.group(1)); mth = int(m.group(2)); yy = int(m.group(3) or base.year)
         try:
@@ -65,7 +87,7 @@ def _extract_date(text: str, base: date):
         except Exception:
             pass
     # em X dias
-    m2 = re.search(r"\bem\s+(\d{1,2})\s+dias?\b", t)
+    m2 = EM_DIAS_RE.search(t)
     if m2:
         return base + timedelta(days=int(m2.group(1)))
     return None
@@ -102,9 +124,8 @@ def parse_quick_entry(text: str, now: datetime | None = None) -> dict:
     # data
     d = _extract_date(title, base)
     if d:
-        title = re.sub(r"\b(hoje|amanhã|amanha|depois de amanhã|segunda|terça|terca|quarta|quinta|sexta|sábado|sabado|domingo|seg|ter|qua|qui|sex|sab|dom)\b",
-                       '', title, flags=re.IGNORECASE).strip(',; .')
-        title = re.sub(r"\b\d{1,2}/\d{1,2}(?:/\d{4})?\b", '', title).strip(',; .')
+        title = _DATE_WORDS_RE.sub('', title).strip(',; .')
+        title = _DATE_DMY_CLEAN_RE.sub('', title).strip(',; .')
 
     if found_time and not d:
         d = base  # hora sem data => hoje
@@ -2,6 +2,10 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
 
+# ✅ Fragmento: reruns disparados dentro dele reexecutam só a função decorada,
+# não o app inteiro. Streamlit antigo sem st.fragment: decorator identidade.
+fragmento = getattr(st, "fragment", None) or (lambda f: f)
+
 def confirmar_exclusao(chave_dialogo: str, titulo: str, on_confirm):
     """
     Abre diálogo de confirmação (quando disponível) SEM exigir 2 cliques.
@@ -5,13 +5,13 @@ import pandas as pd
 from datetime import date, datetime, timedelta
 
 from github_db import (
-    buscar_estudos_subjects, inserir_estudos_subject, atualizar_estudos_subject, deletar_estudos_subject,
-    buscar_estudos_topics, inserir_estudos_topic, atualizar_estudos_topic, deletar_estudos_topic,
-    buscar_estudos_logs, inserir_estudos_log
+    carregar_estudos, inserir_estudos_subject, atualizar_estudos_subject, deletar_estudos_subject,
+    inserir_estudos_topic, atualizar_estudos_topic, deletar_estudos_topic,
+    inserir_estudos_log
 )
 
 
-from ui_helpers import confirmar_exclusao
+from ui_helpers import confirmar_exclusao, fragmento
 
 STATUS_LABEL = {"todo": "Não estudado", "doing": "Estudando", "done": "Estudado"}
 STATUS_ORDER = ["todo", "doing", "done"]
@@ -68,9 +68,11 @@ def _get_state():
         st.session_state.study_timer_topic = None
 
 def recarregar():
-    st.session_state.est_sub = buscar_estudos_subjects()
-    st.session_state.est_topics = buscar_estudos_topics()
-    st.session_state.est_logs = buscar_estudos_logs()
+    # ✅ 1 requisição (lote) no lugar de 3 GETs
+    lote = carregar_estudos()
+    st.session_state.est_sub = lote["subjects"]
+    st.session_state.est_topics = lote["topics"]
+    st.session_state.est_logs = lote["logs"]
 
 def _df_subjects():
     df = pd.DataFrame(st.session_state.est_sub)
@@ -362,6 +364,7 @@ def _next_suggested(df_t, subject_id, current_topic_id=None):
     # fallback: primeiro disponível
     return df.iloc[0]
 
+@fragmento
 def render_estudos():
     st.markdown("""
       <div class="header-container">
@@ -372,9 +375,11 @@ def render_estudos():
 
     _get_state()
 
-    if "est_sub" not in st.session_state: st.session_state.est_sub = buscar_estudos_subjects()
-    if "est_topics" not in st.session_state: st.session_state.est_topics = buscar_estudos_topics()
-    if "est_logs" not in st.session_state: st.session_state.est_logs = buscar_estudos_logs()
+    if not all(k in st.session_state for k in ("est_sub", "est_topics", "est_logs")):
+        lote = carregar_estudos()
+        st.session_state.setdefault("est_sub", lote["subjects"])
+        st.session_state.setdefault("est_topics", lote["topics"])
+        st.session_state.setdefault("est_logs", lote["logs"])
 
     df_s = _df_subjects()
     df_t = _df_topics()
@@ -5,39 +5,103 @@ import pandas as pd
 from datetime import date
 import io
 
-# ReportLab
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm
+# ReportLab / xlsxwriter: importados dentro de gerar_pdf/gerar_excel (só quando há relatório)
 
 # GitHub DB
 from github_db import (
-    buscar_pessoas, buscar_dados, buscar_metas, buscar_fixos,
-    inserir_transacao, atualizar_transacao, deletar_transacao,
-    upsert_meta, inserir_fixo, atualizar_fixo, deletar_fixo
+    buscar_pessoas, buscar_dados, buscar_metas, buscar_fixos, carregar_financeiro,
+    inserir_transacao, anexar_transacao, atualizar_transacao, deletar_transacao,
+    upsert_meta, atualizar_fixo, deletar_fixo, inserir_transacao_com_fixo
 )
 
 # Confirmação de exclusão (UI helper)
-from ui_helpers import confirmar_exclusao
+from ui_helpers import confirmar_exclusao, fragmento
 
+CATEGORIAS = ("🛒 Mercado", "🏠 Moradia", "🚗 Transporte", "🍕 Lazer", "💡 Contas", "💰 Salário", "✨ Outros")
+MESES = ("Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro")
+MES_TO_NUM = {m: i + 1 for i, m in enumerate(MESES)}
+
+EXPORT_COLS = ['data', 'descricao', 'valor', 'tipo', 'status', 'responsavel', 'categoria', 'id']
+
+
+def _df_exportacao(df):
+    """Colunas/ordem da exportação, data em dd/mm/aaaa e vazios como None."""
+    df_exp = df.copy()
+    df_exp['data'] = pd.to_datetime(df_exp['data'], errors='coerce').dt.strftime('%d/%m/%Y')
+    for c in EXPORT_COLS:
+        if c not in df_exp.columns:
+            df_exp[c] = ''
+    df_exp = df_exp[EXPORT_COLS].astype(object)
+    return df_exp.where(df_exp.notna(), None)
+
+# Bytes dos relatórios em cache: a chave é o hash do conteúdo do DataFrame (+ mês),
+# então reruns na aba Caixa só regeram o arquivo quando os lançamentos mudam.
+# max_entries/ttl: cada edição gera uma chave nova; sem limite os bytes antigos
+# ficariam para sempre na memória do processo.
+@st.cache_data(ttl=600, max_entries=8, show_spinner=False)
 def gerar_excel(df):
+    """
+    Escreve linha a linha direto no xlsxwriter (write_row),
+    sem o passe célula-a-célula de formatação do DataFrame.to_excel.
+    """
+    import xlsxwriter
+
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_exp = df.copy()
-        df_exp['data'] = pd.to_datetime(df_exp['data'], errors='coerce').dt.strftime('%d/%m/%Y')
-        colunas = ['data', 'descricao', 'valor', 'tipo', 'status', 'responsavel', 'categoria', 'id']
-        for c in colunas:
-            if c not in df_exp.columns:
-                df_exp[c] = ''
-        df_exp = df_exp[colunas]
-        df_exp.to_excel(writer, index=False, sheet_name='Lançamentos')
+    wb = xlsxwriter.Workbook(output, {'in_memory': True})
+    ws = wb.add_worksheet('Lançamentos')
+    ws.write_row(0, 0, EXPORT_COLS, wb.add_format({'bold': True}))  # cabeçalho em negrito, como no to_excel
+    for i, row in enumerate(_df_exportacao(df).itertuples(index=False, name=None), start=1):
+        ws.write_row(i, 0, row)
+    wb.close()
     return output.getvalue()
 
+@st.cache_data(ttl=600, max_entries=8, show_spinner=False)
+def gerar_csv(df):
+    # utf-8-sig: Excel abre acentos corretamente
+    return _df_exportacao(df).to_csv(index=False).encode('utf-8-sig')
+
+_BR_NUM = str.maketrans(",.", ".,")
+
+PDF_ROWS_PER_TABLE = 40
+
+
+@st.cache_resource(show_spinner=False)
+def _pdf_estilos():
+    """(título, tabela) do PDF — montados uma vez por processo, no primeiro relatório."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    title_style = ParagraphStyle('TitleCenter', parent=getSampleStyleSheet()['Heading1'], alignment=1, fontName='Helvetica-Bold', fontSize=16, leading=20, spaceAfter=6)
+    table_style = TableStyle([
+        ('FONT', (0,0), (-1,0), 'Helvetica-Bold', 10),
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#E6ECF5")),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.HexColor("#141A22")),
+        ('ALIGN', (0,0), (-1,0), 'CENTER'),
+        ('FONT', (0,1), (-1,-1), 'Helvetica', 9),
+        ('TEXTCOLOR', (0,1), (-1,-1), colors.black),
+        ('ALIGN', (2,1), (2,-1), 'RIGHT'),
+        ('ALIGN', (0,1), (0,-1), 'CENTER'),
+        ('ALIGN', (3,1), (5,-1), 'CENTER'),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.HexColor("#C8D2DC")),
+        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor("#FAFBFD")]),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ])
+    return title_style, table_style
+
+
+@st.cache_data(ttl=600, max_entries=8, show_spinner=False)
 def gerar_pdf(df, nome_mes):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, PageBreak
+
+    title_style, table_style = _pdf_estilos()
     buffer = io.BytesIO()
     df_exp = df.copy()
+    # categóricas -> object (fillna com valor fora das categorias quebraria)
+    cat_cols = df_exp.select_dtypes('category').columns
+    df_exp[cat_cols] = df_exp[cat_cols].astype(object)
     df_exp['data'] = pd.to_datetime(df_exp['data'], errors='coerce')
     df_exp['data_fmt'] = df_exp['data'].dt.strftime('%d/%m/%Y').fillna('')
     df_exp['descricao'] = df_exp['descricao'].fillna('').astype(str)
@@ -55,47 +119,136 @@ def gerar_pdf(df, nome_mes):
     df_exp = df_exp.sort_values(by=['data', 'descricao'], na_position='last')
 
     doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=12*mm, rightMargin=12*mm, topMargin=14*mm, bottomMargin=14*mm)
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle('TitleCenter', parent=styles['Heading1'], alignment=1, fontName='Helvetica-Bold', fontSize=16, leading=20, spaceAfter=6)
     elements = []
     elements.append(Paragraph(f"Relatorio Financeiro - {nome_mes}", title_style))
     elements.append(Spacer(1, 6))
 
     header = ["Data", "Descricao", "Valor", "Tipo", "Status", "Responsável"]
-    data_rows = []
-    for _, r in df_exp.iterrows():
-        valor_txt = f"R$ {r['valor']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        data_rows.append([r['data_fmt'], r['descricao'], valor_txt, r['tipo'], r['status'], r['responsavel']])
-    table_data = [header] + data_rows
+    # Formatação vetorizada (1 passada por coluna); milhar/decimal BR via translate
+    valor_txt = ('R$ ' + df_exp['valor'].map('{:,.2f}'.format)).str.translate(_BR_NUM)
+    data_rows = list(map(list, zip(
+        df_exp['data_fmt'], df_exp['descricao'], valor_txt,
+        df_exp['tipo'], df_exp['status'], df_exp['responsavel']
+    )))
     col_widths = [22*mm, 70*mm, 25*mm, 22*mm, 22*mm, 25*mm]
 
-    tbl = Table(table_data, colWidths=col_widths, repeatRows=1)
-    tbl.setStyle(TableStyle([
-        ('FONT', (0,0), (-1,0), 'Helvetica-Bold', 10),
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#E6ECF5")),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.HexColor("#141A22")),
-        ('ALIGN', (0,0), (-1,0), 'CENTER'),
-        ('FONT', (0,1), (-1,-1), 'Helvetica', 9),
-        ('TEXTCOLOR', (0,1), (-1,-1), colors.black),
-        ('ALIGN', (2,1), (2,-1), 'RIGHT'),
-        ('ALIGN', (0,1), (0,-1), 'CENTER'),
-        ('ALIGN', (3,1), (5,-1), 'CENTER'),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.HexColor("#C8D2DC")),
-        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor("#FAFBFD")]),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-    ]))
-    elements.append(tbl)
+    # Tabelas de até PDF_ROWS_PER_TABLE linhas (layout do reportlab degrada com tabela única enorme)
+    for ini in range(0, max(len(data_rows), 1), PDF_ROWS_PER_TABLE):
+        if ini:
+            elements.append(PageBreak())
+        tbl = Table([header] + data_rows[ini:ini + PDF_ROWS_PER_TABLE], colWidths=col_widths, repeatRows=1)
+        tbl.setStyle(table_style)
+        elements.append(tbl)
+
     doc.build(elements)
     pdf_bytes = buffer.getvalue()
     buffer.close()
     return pdf_bytes
 
+@st.cache_data(ttl=600, max_entries=8, show_spinner=False)
+def resumo_mensal(df: pd.DataFrame) -> dict[tuple[int, int], tuple[float, float]]:
+    """
+    (ano, mês) -> (entradas, saídas pagas), numa única passada/groupby por _y/_m.
+    Chave (0, 0) agrega lançamentos sem data (contam no patrimônio, não em mês algum).
+    Em cache: trocar mês/ano no seletor vira só um dict.get().
+    """
+    if df.empty:
+        return {}
+    valor = pd.to_numeric(df['valor'], errors='coerce').fillna(0.0)
+    entrada = df['tipo'] == 'Entrada'
+    saida_paga = (df['tipo'] == 'Saída') & (df['status'] == 'Pago')
+    partes = pd.DataFrame({
+        'entradas': valor.where(entrada, 0.0),
+        'saidas_pagas': valor.where(saida_paga, 0.0),
+    })
+    soma = partes.groupby([df['_y'], df['_m']]).sum()
+    return {
+        (int(a), int(m)): (float(e), float(sp))
+        for (a, m), e, sp in zip(soma.index, soma['entradas'], soma['saidas_pagas'])
+    }
+
+def _com_formatos(df: pd.DataFrame, fmt_data: str, data_vazia: str) -> pd.DataFrame:
+    """
+    Acrescenta v_fmt ("R$ 1,234.56") e d_fmt (data formatada) numa passada vetorizada,
+    para os cards não formatarem valor/data linha a linha.
+    (Sem "_" no nome: itertuples renomeia campos que começam com underscore.)
+    """
+    return df.assign(
+        v_fmt='R$ ' + df['valor'].map('{:,.2f}'.format),
+        d_fmt=df['data'].dt.strftime(fmt_data).fillna(data_vazia),
+    )
+
 def idx_pessoa(valor: str, pessoas: list[str]) -> int:
     try:
         return pessoas.index(valor)
     except Exception:
         return pessoas.index('Ambos') if 'Ambos' in pessoas else 0
 
+# Fragmentos: interações dentro da aba "Novo" reexecutam só o fragmento,
+# não o extrato/cards do mês. Gravações chamam st.rerun() (app inteiro).
+@fragmento
+def _form_novo_lancamento(pessoas: list[str]):
+    with st.form("form_fin_novo", clear_on_submit=True):
+        v = st.number_input("Valor", min_value=0.0)
+        d = st.text_input("Descrição")
+        t = st.radio("Tipo", ["Saída", "Entrada"], horizontal=True)
+        stat = st.selectbox("Status", ["Pago", "Pendente", "Em Negociação"])
+        c = st.selectbox("Categoria", CATEGORIAS)
+        resp = st.selectbox("Responsável", pessoas, index=idx_pessoa("Ambos", pessoas))
+        dt = st.date_input("Data/Vencimento", date.today())
+        fixo_check = st.checkbox("Salvar na lista de Fixos")
+        if st.form_submit_button("Salvar"):
+            if v > 0:
+                reg = {
+                    "data": str(dt), "descricao": d, "valor": float(v),
+                    "tipo": t, "categoria": c, "status": stat,
+                    "responsavel": resp
+                }
+                if fixo_check:
+                    # ✅ transação + fixo num commit só
+                    nova = inserir_transacao_com_fixo(reg, {
+                        "descricao": d, "valor": float(v), "categoria": c,
+                        "responsavel": resp
+                    })
+                    st.session_state.fixos = buscar_fixos()
+                else:
+                    nova = inserir_transacao(reg)
+                st.success("Cadastrado!")
+                # ✅ anexa localmente o registro gravado (sem reler o arquivo todo)
+                st.session_state.dados = anexar_transacao(st.session_state.dados, nova) if nova else buscar_dados()
+                st.session_state.pessoas = buscar_pessoas()
+                st.rerun()
+            else:
+                st.error("O valor deve ser maior que zero.")
+
+@fragmento
+def _gerenciar_fixos(ano_ref: int, mes_num: int, pessoas: list[str]):
+    if not st.session_state.fixos.empty:
+        for idx, row in st.session_state.fixos.iterrows():
+            with st.expander(f"📌 {row['descricao']} - R$ {row['valor']:,.2f}"):
+                if st.button("Lançar neste mês", key=f"fin_launch_{row['id']}"):
+                    d_f = str(date(ano_ref, mes_num, 1))
+                    nova = inserir_transacao({
+                        "data": d_f, "descricao": row['descricao'], "valor": float(row['valor']),
+                        "tipo": "Saída", "categoria": row['categoria'], "status": "Pago",
+                        "responsavel": row.get('responsavel', 'Ambos')
+                    })
+                    st.session_state.dados = anexar_transacao(st.session_state.dados, nova) if nova else buscar_dados()
+                    st.toast("Lançado!")
+                    st.rerun()
+                st.divider()
+                new_desc = st.text_input("Editar Descrição", value=row['descricao'], key=f"fin_ed_d_{row['id']}")
+                new_val = st.number_input("Editar Valor", value=float(row['valor']), key=f"fin_ed_v_{row['id']}")
+                new_resp = st.selectbox("Responsável", pessoas, index=idx_pessoa(row.get('responsavel', 'Ambos'), pessoas), key=f"fin_ed_r_{row['id']}")
+                col_ed1, col_ed2 = st.columns(2)
+                if col_ed1.button("Salvar Alterações", key=f"fin_save_fix_{row['id']}"):
+                    atualizar_fixo(int(row['id']), {"descricao": new_desc, "valor": float(new_val), "responsavel": new_resp})
+                    st.session_state.fixos = buscar_fixos(); st.rerun()
+                if col_ed2.button("❌ Remover Fixo", key=f"fin_del_fix_{row['id']}"):
+                    confirmar_exclusao(f"dlg_fix_{row['id']}", "Confirmar exclusão", lambda: deletar_fixo(int(row['id'])))
+    else:
+        st.caption("Sem fixos configurados.")
+
 def render_financeiro():
     # Header (local da aba)
     st.markdown("""
@@ -105,18 +258,15 @@ def render_financeiro():
       </div>
     """, unsafe_allow_html=True)
 
-    # Sincronização inicial em sessão
-    if 'dados' not in st.session_state:
-        st.session_state.dados = buscar_dados()
-    if 'metas' not in st.session_state:
-        st.session_state.metas = buscar_metas()
-    if 'fixos' not in st.session_state:
-        st.session_state.fixos = buscar_fixos()
-    if 'pessoas' not in st.session_state or not st.session_state.pessoas:
-        st.session_state.pessoas = buscar_pessoas()
-
-    CATEGORIAS = ["🛒 Mercado", "🏠 Moradia", "🚗 Transporte", "🍕 Lazer", "💡 Contas", "💰 Salário", "✨ Outros"]
-    meses = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+    # Sincronização inicial em sessão (1 requisição em lote para os 4 arquivos)
+    if any(k not in st.session_state for k in ('dados', 'metas', 'fixos')) or not st.session_state.get('pessoas'):
+        dados, metas, fixos, pessoas = carregar_financeiro()
+        st.session_state.setdefault('dados', dados)
+        st.session_state.setdefault('metas', metas)
+        st.session_state.setdefault('fixos', fixos)
+        if not st.session_state.get('pessoas'):
+            st.session_state.pessoas = pessoas
+
     PESSOAS = st.session_state.pessoas
 
     # Navegação de Mês/Ano com +/-
@@ -128,11 +278,11 @@ def render_financeiro():
 
     c_nav1, c_nav2, c_nav3, c_nav4 = st.columns([0.6, 2.4, 1, 0.6])
     prev = c_nav1.button("◀", key="fin_prev_m", help="Mês anterior")
-    mes_nome = c_nav2.selectbox("Mês", meses, index=st.session_state.fin_mes - 1)
+    mes_nome = c_nav2.selectbox("Mês", MESES, index=st.session_state.fin_mes - 1)
     ano_ref = c_nav3.number_input("Ano", value=st.session_state.fin_ano, step=1)
     nxt = c_nav4.button("▶", key="fin_next_m", help="Próximo mês")
 
-    st.session_state.fin_mes = meses.index(mes_nome) + 1
+    st.session_state.fin_mes = MES_TO_NUM[mes_nome]
     st.session_state.fin_ano = int(ano_ref)
 
     if prev:
@@ -154,34 +304,32 @@ def render_financeiro():
     ano_ref = st.session_state.fin_ano
 
     # Processamento
-    df_geral = st.session_state.dados.copy()
+    # Somente leitura: filtros/máscaras abaixo não alteram o DataFrame da sessão
+    df_geral = st.session_state.dados
     colunas_padrao = ['id', 'data', 'descricao', 'valor', 'tipo', 'categoria', 'status', 'responsavel']
     df_mes = pd.DataFrame(columns=colunas_padrao)
     df_atrasados_passado = pd.DataFrame(columns=colunas_padrao)
     total_in = 0.0
     total_out_pagas = 0.0
     balanco = 0.0
+    entradas = 0.0
+    saidas_pagas = 0.0
 
     if not df_geral.empty:
-        total_in = df_geral[df_geral['tipo'] == 'Entrada']['valor'].sum()
-        total_out_pagas = df_geral[(df_geral['tipo'] == 'Saída') & (df_geral['status'] == 'Pago')]['valor'].sum()
+        resumo = resumo_mensal(df_geral)
+        total_in = sum(e for e, _ in resumo.values())
+        total_out_pagas = sum(sp for _, sp in resumo.values())
         balanco = total_in - total_out_pagas
+        entradas, saidas_pagas = resumo.get((ano_ref, mes_num), (0.0, 0.0))
 
-        df_mes = df_geral[
-            (df_geral['data'].dt.month == mes_num) &
-            (df_geral['data'].dt.year == ano_ref)
-        ].copy()
-
-        if 'responsavel' not in df_mes.columns:
-            df_mes['responsavel'] = 'Ambos'
-        df_mes['responsavel'] = df_mes['responsavel'].fillna('Ambos').astype(str)
+        df_mes = df_geral[(df_geral['_m'] == mes_num) & (df_geral['_y'] == ano_ref)]
 
         data_inicio_mes_selecionado = pd.Timestamp(date(ano_ref, mes_num, 1))
         df_atrasados_passado = df_geral[
             (df_geral['status'] == 'Pendente') &
             (df_geral['data'] < data_inicio_mes_selecionado) &
             (df_geral['tipo'] == 'Saída')
-        ].copy()
+        ]
 
     # Abas internas do Financeiro
     aba_resumo, aba_novo, aba_reserva, aba_negociacao, aba_metas, aba_sonhos = st.tabs(
@@ -192,18 +340,16 @@ def render_financeiro():
         if not df_atrasados_passado.empty:
             total_atrasado = df_atrasados_passado['valor'].sum()
             with st.expander(f"⚠️ CONTAS PENDENTES DE MESES ANTERIORES: R$ {total_atrasado:,.2f}", expanded=True):
-                for _, row in df_atrasados_passado.iterrows():
+                for row in df_atrasados_passado.itertuples(index=False):
                     col_at1, col_at2 = st.columns([3, 1])
-                    dt_txt = row['data'].strftime('%d/%m/%y') if pd.notnull(row['data']) else '--/--/--'
-                    col_at1.write(f"**{row['descricao']}** ({dt_txt}) — **Resp.: {row.get('responsavel','Ambos')}**")
-                    if col_at2.button("✔ Pagar", key=f"fin_pay_at_{row['id']}"):
-                        atualizar_transacao(int(row['id']), {"status": "Pago"})
+                    dt_txt = row.data.strftime('%d/%m/%y') if pd.notnull(row.data) else '--/--/--'
+                    col_at1.write(f"**{row.descricao}** ({dt_txt}) — **Resp.: {row.responsavel}**")
+                    if col_at2.button("✔ Pagar", key=f"fin_pay_at_{row.id}"):
+                        atualizar_transacao(int(row.id), {"status": "Pago"})
                         st.toast("Pagamento registrado.")
                         st.session_state.dados = buscar_dados(); st.rerun()
 
         if not df_mes.empty:
-            entradas = df_mes[df_mes['tipo'] == 'Entrada']['valor'].sum()
-            saidas_pagas = df_mes[(df_mes['tipo'] == 'Saída') & (df_mes['status'] == 'Pago')]['valor'].sum()
             saldo_mes = entradas - saidas_pagas
 
             c1, c2, c3 = st.columns(3)
@@ -213,7 +359,7 @@ def render_financeiro():
 
             if st.session_state.metas:
                 with st.expander("🎯 Status das Metas"):
-                    gastos_cat = df_mes[(df_mes['tipo'] == 'Saída') & (df_mes['status'] == 'Pago')].groupby('categoria')['valor'].sum()
+                    gastos_cat = df_mes[(df_mes['tipo'] == 'Saída') & (df_mes['status'] == 'Pago')].groupby('categoria', observed=True)['valor'].sum()
                     for cat, lim in st.session_state.metas.items():
                         if lim > 0:
                             atual = gastos_cat.get(cat, 0)
@@ -221,10 +367,12 @@ def render_financeiro():
                             st.progress(min(atual/lim, 1.0))
 
             st.markdown("### Histórico")
-            for idx, row in df_mes.sort_values(by='data', ascending=False).iterrows():
-                valor_class = "entrada" if row['tipo'] == "Entrada" else "saida"
-                icon = row['categoria'].split()[0] if " " in row['categoria'] else "💸"
-                s_text = row.get('status', 'Pago')
+            # Espaçador entre cards vai no markdown do próximo card (1 delta por linha, não 2)
+            sep = ""
+            for row in _com_formatos(df_mes, '%d %b', '-- ---').itertuples(index=False):
+                valor_class = "entrada" if row.tipo == "Entrada" else "saida"
+                icon = row.categoria.split()[0] if " " in row.categoria else "💸"
+                s_text = row.status
 
                 if s_text == "Pago":
                     s_class = "pago"
@@ -234,105 +382,53 @@ def render_financeiro():
                     s_class = "negociacao"
 
                 txt_venc = ""
-                if s_text == "Pendente" and row['tipo'] == "Saída" and pd.notnull(row['data']):
-                    dias_diff = (row['data'].date() - date.today()).days
+                if s_text == "Pendente" and row.tipo == "Saída" and pd.notnull(row.data):
+                    dias_diff = (row.data.date() - date.today()).days
                     if dias_diff < 0:
                         txt_venc = f" <span class='vencimento-alerta'>Atrasada há {-dias_diff} dias</span>"
                     elif dias_diff == 0:
                         txt_venc = f" <span class='vencimento-alerta' style='color:#D97706'>Vence Hoje!</span>"
 
-                resp_txt = row.get('responsavel', 'Ambos')
-                dt_card = row['data'].strftime('%d %b') if pd.notnull(row['data']) else '-- ---'
+                resp_txt = row.responsavel
 
-                st.markdown(f"""
+                st.markdown(f"""{sep}
                   <div class="transaction-card">
                     <div class="transaction-left">
                       <div class="card-icon">{icon}</div>
                       <div class="tc-info">
-                        <div class="tc-title">{row["descricao"]}</div>
-                        <div class="tc-meta">{dt_card}{txt_venc}</div>
+                        <div class="tc-title">{row.descricao}</div>
+                        <div class="tc-meta">{row.d_fmt}{txt_venc}</div>
                         <div class="tc-meta">Responsável: <b>{resp_txt}</b></div>
                         <div class="status-badge {s_class}">{s_text}</div>
                       </div>
                     </div>
-                    <div class="transaction-right {valor_class}">R$ {row["valor"]:,.2f}</div>
+                    <div class="transaction-right {valor_class}">{row.v_fmt}</div>
                   </div>
                 """, unsafe_allow_html=True)
 
                 cp, cd = st.columns([1, 1])
                 with cp:
-                    if s_text != "Pago" and st.button("✔ Pagar", key=f"fin_pay_{row['id']}"):
-                        atualizar_transacao(int(row['id']), {"status": "Pago"})
+                    if s_text != "Pago" and st.button("✔ Pagar", key=f"fin_pay_{row.id}"):
+                        atualizar_transacao(int(row.id), {"status": "Pago"})
                         st.toast("Pagamento registrado.")
                         st.session_state.dados = buscar_dados(); st.rerun()
                 with cd:
                     st.markdown('<div class="btn-danger">', unsafe_allow_html=True)
-                    if st.button("Excluir", key=f"fin_del_{row['id']}"):
-                        confirmar_exclusao(f"dlg_fin_{row['id']}", "Confirmar exclusão", lambda: deletar_transacao(int(row['id'])))
+                    if st.button("Excluir", key=f"fin_del_{row.id}"):
+                        confirmar_exclusao(f"dlg_fin_{row.id}", "Confirmar exclusão", lambda rid_=int(row.id): deletar_transacao(rid_))
                     st.markdown('</div>', unsafe_allow_html=True)
 
-                st.markdown("<br>", unsafe_allow_html=True)
+                sep = "<br>"
         else:
             st.info("Toque em 'Novo' para começar!")
 
     with aba_novo:
         aba_unit, aba_fixo = st.tabs(["Lançamento Único", "🗓️ Gerenciar Fixos"])
         with aba_unit:
-            with st.form("form_fin_novo", clear_on_submit=True):
-                v = st.number_input("Valor", min_value=0.0)
-                d = st.text_input("Descrição")
-                t = st.radio("Tipo", ["Saída", "Entrada"], horizontal=True)
-                stat = st.selectbox("Status", ["Pago", "Pendente", "Em Negociação"])
-                c = st.selectbox("Categoria", CATEGORIAS)
-                resp = st.selectbox("Responsável", PESSOAS, index=idx_pessoa("Ambos", PESSOAS))
-                dt = st.date_input("Data/Vencimento", date.today())
-                fixo_check = st.checkbox("Salvar na lista de Fixos")
-                if st.form_submit_button("Salvar"):
-                    if v > 0:
-                        inserir_transacao({
-                            "data": str(dt), "descricao": d, "valor": float(v),
-                            "tipo": t, "categoria": c, "status": stat,
-                            "responsavel": resp
-                        })
-                        if fixo_check:
-                            inserir_fixo({
-                                "descricao": d, "valor": float(v), "categoria": c,
-                                "responsavel": resp
-                            })
-                        st.success("Cadastrado!")
-                        st.session_state.dados = buscar_dados()
-                        st.session_state.fixos = buscar_fixos()
-                        st.session_state.pessoas = buscar_pessoas()
-                        st.rerun()
-                    else:
-                        st.error("O valor deve ser maior que zero.")
+            _form_novo_lancamento(PESSOAS)
 
         with aba_fixo:
-            if not st.session_state.fixos.empty:
-                for idx, row in st.session_state.fixos.iterrows():
-                    with st.expander(f"📌 {row['descricao']} - R$ {row['valor']:,.2f}"):
-                        if st.button("Lançar neste mês", key=f"fin_launch_{row['id']}"):
-                            d_f = str(date(ano_ref, mes_num, 1))
-                            inserir_transacao({
-                                "data": d_f, "descricao": row['descricao'], "valor": float(row['valor']),
-                                "tipo": "Saída", "categoria": row['categoria'], "status": "Pago",
-                                "responsavel": row.get('responsavel', 'Ambos')
-                            })
-                            st.session_state.dados = buscar_dados()
-                            st.toast("Lançado!")
-                            st.rerun()
-                        st.divider()
-                        new_desc = st.text_input("Editar Descrição", value=row['descricao'], key=f"fin_ed_d_{row['id']}")
-                        new_val = st.number_input("Editar Valor", value=float(row['valor']), key=f"fin_ed_v_{row['id']}")
-                        new_resp = st.selectbox("Responsável", PESSOAS, index=idx_pessoa(row.get('responsavel', 'Ambos'), PESSOAS), key=f"fin_ed_r_{row['id']}")
-                        col_ed1, col_ed2 = st.columns(2)
-                        if col_ed1.button("Salvar Alterações", key=f"fin_save_fix_{row['id']}"):
-                            atualizar_fixo(int(row['id']), {"descricao": new_desc, "valor": float(new_val), "responsavel": new_resp})
-                            st.session_state.fixos = buscar_fixos(); st.rerun()
-                        if col_ed2.button("❌ Remover Fixo", key=f"fin_del_fix_{row['id']}"):
-                            confirmar_exclusao(f"dlg_fix_{row['id']}", "Confirmar exclusão", lambda: deletar_fixo(int(row['id'])))
-            else:
-                st.caption("Sem fixos configurados.")
+            _gerenciar_fixos(ano_ref, mes_num, PESSOAS)
 
     with aba_reserva:
         st.markdown(
@@ -348,19 +444,12 @@ def render_financeiro():
         st.markdown("### 📄 Relatórios")
 
         if not st.session_state.dados.empty:
-            df_para_relatorio = st.session_state.dados.copy()
-            df_para_relatorio['data'] = pd.to_datetime(df_para_relatorio['data'], errors='coerce')
-            mask = (
-                (df_para_relatorio['data'].dt.month == mes_num) &
-                (df_para_relatorio['data'].dt.year == ano_ref)
-            )
-            df_para_relatorio = df_para_relatorio[mask].copy()
-            df_para_relatorio = df_para_relatorio.sort_values(by=['data', 'descricao'], na_position='last')
+            df_para_relatorio = df_mes.sort_values(by=['data', 'descricao'], na_position='last')
 
             st.caption(f"🧾 {len(df_para_relatorio)} lançamentos em **{mes_nome}/{ano_ref}**")
 
             if not df_para_relatorio.empty:
-                col_rel1, col_rel2 = st.columns(2)
+                col_rel1, col_rel2, col_rel3 = st.columns(3)
                 with col_rel1:
                     st.download_button(
                         label="📥 Baixar Excel",
@@ -375,6 +464,13 @@ def render_financeiro():
                         file_name=f"Financeiro_{mes_nome}.pdf",
                         mime="application/pdf"
                     )
+                with col_rel3:
+                    st.download_button(
+                        label="📥 Baixar CSV",
+                        data=gerar_csv(df_para_relatorio),
+                        file_name=f"Financeiro_{mes_nome}.csv",
+                        mime="text/csv"
+                    )
             else:
                 st.caption("Selecione um mês com dados para gerar relatórios.")
         else:
@@ -386,11 +482,7 @@ def render_financeiro():
         if st.session_state.dados.empty:
             st.info("Não há dados.")
         else:
-            df_neg = st.session_state.dados.copy()
-            if 'responsavel' not in df_neg.columns:
-                df_neg['responsavel'] = 'Ambos'
-            df_neg['responsavel'] = df_neg['responsavel'].fillna('Ambos').astype(str)
-            df_neg = df_neg[df_neg['status'] == "Em Negociação"]
+            df_neg = df_geral[df_geral['status'] == "Em Negociação"]
 
             col_f1, col_f2 = st.columns([2,1])
             resp_filtro = col_f1.selectbox("Responsável", ["Todos"] + PESSOAS, index=0)
@@ -399,18 +491,15 @@ def render_financeiro():
             if resp_filtro != "Todos":
                 df_neg = df_neg[df_neg['responsavel'] == resp_filtro]
 
-            if somente_mes and 'data' in df_neg.columns:
-                df_neg = df_neg[
-                    (df_neg['data'].dt.month == mes_num) &
-                    (df_neg['data'].dt.year == ano_ref)
-                ]
+            if somente_mes:
+                df_neg = df_neg[(df_neg['_m'] == mes_num) & (df_neg['_y'] == ano_ref)]
 
             if df_neg.empty:
                 st.caption("Sem itens em negociação com os filtros atuais.")
             else:
                 total_neg = float(df_neg['valor'].sum())
                 qtd_neg = int(len(df_neg))
-                por_pessoa = df_neg.groupby('responsavel')['valor'].sum().sort_values(ascending=False)
+                por_pessoa = df_neg.groupby('responsavel', observed=True)['valor'].sum().sort_values(ascending=False)
 
                 m1, m2 = st.columns(2)
                 m1.metric("Total em Negociação", f"R$ {total_neg:,.2f}")
@@ -421,46 +510,46 @@ def render_financeiro():
                         st.write(f"**{pessoa}** — R$ {soma:,.2f}")
 
                 st.markdown("#### Itens")
-                for _, row in df_neg.sort_values(by='data', ascending=False).iterrows():
-                    icon = row['categoria'].split()[0] if " " in row['categoria'] else "💬"
-                    dt_txt = row['data'].strftime('%d/%m/%Y') if pd.notnull(row['data']) else '--/--/----'
-                    st.markdown(f"""
+                sep = ""
+                for row in _com_formatos(df_neg, '%d/%m/%Y', '--/--/----').itertuples(index=False):
+                    icon = row.categoria.split()[0] if " " in row.categoria else "💬"
+                    st.markdown(f"""{sep}
                     <div class="transaction-card">
                       <div class="transaction-left">
                         <div class="card-icon">{icon}</div>
                         <div class="tc-info">
-                          <div class="tc-title">{row['descricao']}</div>
-                          <div class="tc-meta">{dt_txt} • <b>{row['categoria']}</b></div>
+                          <div class="tc-title">{row.descricao}</div>
+                          <div class="tc-meta">{row.d_fmt} • <b>{row.categoria}</b></div>
                           <div class="status-badge negociacao">Em Negociação</div>
-                          <div class="tc-meta">Responsável: <b>{row.get('responsavel','Ambos')}</b></div>
+                          <div class="tc-meta">Responsável: <b>{row.responsavel}</b></div>
                         </div>
                       </div>
-                      <div class="transaction-right saida">R$ {row['valor']:,.2f}</div>
+                      <div class="transaction-right saida">{row.v_fmt}</div>
                     </div>
                     """, unsafe_allow_html=True)
 
                     cA, cB, cC, cD = st.columns([1,1,2,1])
                     with cA:
-                        if st.button("Marcar Pendente", key=f"fin_neg_to_pen_{row['id']}"):
-                            atualizar_transacao(int(row['id']), {"status": "Pendente"})
+                        if st.button("Marcar Pendente", key=f"fin_neg_to_pen_{row.id}"):
+                            atualizar_transacao(int(row.id), {"status": "Pendente"})
                             st.session_state.dados = buscar_dados(); st.rerun()
                     with cB:
-                        if st.button("Marcar Pago", key=f"fin_neg_to_pago_{row['id']}"):
-                            atualizar_transacao(int(row['id']), {"status": "Pago"})
+                        if st.button("Marcar Pago", key=f"fin_neg_to_pago_{row.id}"):
+                            atualizar_transacao(int(row.id), {"status": "Pago"})
                             st.session_state.dados = buscar_dados(); st.rerun()
                     with cC:
                         novo_resp = st.selectbox(
                             "Responsável",
                             PESSOAS,
-                            index=idx_pessoa(row.get('responsavel', 'Ambos'), PESSOAS),
-                            key=f"fin_resp_{row['id']}"
+                            index=idx_pessoa(row.responsavel, PESSOAS),
+                            key=f"fin_resp_{row.id}"
                         )
                     with cD:
-                        if st.button("Salvar Resp.", key=f"fin_save_resp_{row['id']}"):
-                            atualizar_transacao(int(row['id']), {"responsavel": novo_resp})
+                        if st.button("Salvar Resp.", key=f"fin_save_resp_{row.id}"):
+                            atualizar_transacao(int(row.id), {"responsavel": novo_resp})
                             st.session_state.dados = buscar_dados(); st.rerun()
 
-                    st.markdown("<br>", unsafe_allow_html=True)
+                    sep = "<br>"
 
     with aba_metas:
         st.info("💡 Exemplo: Defina R$ 1.000,00 para '🛒 Mercado' para controlar seus gastos essenciais.")
@@ -478,9 +567,7 @@ def render_financeiro():
         v_sonho = st.number_input("Custo do Objetivo (R$)", min_value=0.0, key="fin_custo_sonho")
         if v_sonho > 0:
             try:
-                entradas_sonho = df_mes[df_mes['tipo'] == 'Entrada']['valor'].sum()
-                saidas_sonho = df_mes[(df_mes['tipo'] == 'Saída') & (df_mes['status'] == 'Pago')]['valor'].sum()
-                sobra_m = entradas_sonho - saidas_sonho
+                sobra_m = entradas - saidas_pagas
                 if sobra_m > 0:
                     m_f = int(v_sonho / sobra_m) + 1
                     st.info(f"Faltam aprox. **{m_f} meses**.")
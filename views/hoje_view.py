@@ -8,6 +8,7 @@ import streamlit as st
 from datetime import datetime, date, timedelta
 
 from nlp_pt import parse_quick_entry
+from ui_helpers import fragmento
 from github_db import (
     # Tarefas / Eventos
     buscar_tasks, inserir_task, atualizar_task,
@@ -15,12 +16,13 @@ from github_db import (
     # Saúde
     buscar_agua_logs, inserir_agua,
     buscar_peso_logs, inserir_peso,
-    buscar_activity_logs, buscar_workout_logs,
-    buscar_saude_config,
 
     # Estudos
-    buscar_estudos_topics, buscar_estudos_subjects, buscar_estudos_logs,
+    buscar_estudos_logs,
     inserir_estudos_log, atualizar_estudos_topic,
+
+    # Estado inicial em lote
+    carregar_hoje,
 )
 
 # ============================================================
@@ -231,8 +233,6 @@ def _study_planned_today(topics: list[dict], hoje: date) -> list[dict]:
     wd = hoje.weekday()
     planned = []
     for tp in (topics or []):
-        if not isinstance(tp, dict):
-            continue
         if not tp.get("active", True):
             continue
         if str(tp.get("status")) == "done":
@@ -284,8 +284,6 @@ def _pick_topic_id_for_study(query: str, topics: list[dict], planned_today: list
     best_sc = 0
     best_id = None
     for tp in (topics or []):
-        if not isinstance(tp, dict):
-            continue
         if not tp.get("active", True):
             continue
         if str(tp.get("status")) == "done":
@@ -399,6 +397,7 @@ def _parse_universal(text: str, topics: list[dict], planned_today: list[dict], s
 # =========================
 # Render HOJE
 # =========================
+@fragmento
 def render_hoje():
     st.markdown("""
       <div class="header-container">
@@ -409,39 +408,22 @@ def render_hoje():
 
     hoje = _today()
 
-    # ---------- cache em sessão ----------
-    if "tasks" not in st.session_state:
-        st.session_state.tasks = buscar_tasks()
-
-    if "agua_logs" not in st.session_state:
-        st.session_state.agua_logs = buscar_agua_logs()
-
-    if "peso_logs" not in st.session_state:
-        st.session_state.peso_logs = buscar_peso_logs()
-
-    if "activity_logs" not in st.session_state:
-        st.session_state.activity_logs = buscar_activity_logs()
-
-    if "w_logs" not in st.session_state:
-        st.session_state.w_logs = buscar_workout_logs()
-
-    if "saude_cfg" not in st.session_state:
-        st.session_state.saude_cfg = buscar_saude_config()
-
-    if "est_subjects" not in st.session_state:
-        st.session_state.est_subjects = buscar_estudos_subjects()
-
-    if "est_topics" not in st.session_state:
-        st.session_state.est_topics = buscar_estudos_topics()
-
-    if "est_logs" not in st.session_state:
-        st.session_state.est_logs = buscar_estudos_logs()
+    # ---------- cache em sessão (1 requisição em lote para o que faltar) ----------
+    chaves = {
+        "tasks": "tasks", "agua_logs": "agua_logs", "peso_logs": "peso_logs",
+        "activity_logs": "activity_logs", "w_logs": "workout_logs", "saude_cfg": "saude_config",
+        "est_subjects": "est_subjects", "est_topics": "est_topics", "est_logs": "est_logs",
+    }
+    if any(k not in st.session_state for k in chaves):
+        lote = carregar_hoje()
+        for k, src in chaves.items():
+            st.session_state.setdefault(k, lote[src])
 
     # ---------- estudos: subj_map + planejados hoje ----------
     subj_map = {
         int(s.get("id")): (s.get("name") or "").strip()
         for s in (st.session_state.est_subjects or [])
-        if isinstance(s, dict) and str(s.get("id", "")).isdigit()
+        if str(s.get("id", "")).isdigit()
     }
 
     planned = _study_planned_today(st.session_state.est_topics, hoje)
@@ -523,7 +505,7 @@ def render_hoje():
             seen.add(tid)
 
         for tp in (st.session_state.est_topics or []):
-            if not isinstance(tp, dict) or not tp.get("active", True) or str(tp.get("status")) == "done":
+            if not tp.get("active", True) or str(tp.get("status")) == "done":
                 continue
             try:
                 tid = int(tp.get("id"))
@@ -11,16 +11,16 @@ from github_db import (
     # Dados existentes
     buscar_peso_logs, inserir_peso,
     buscar_agua_logs, inserir_agua,
-    buscar_workout_logs,
 
     # Painel
     buscar_saude_profile, upsert_saude_profile,
     buscar_meals, inserir_meal, atualizar_meal, deletar_meal,
     buscar_habit_checks, upsert_habit_check,
     buscar_activity_logs, inserir_activity_log, deletar_activity_log,
+    batch_writes, carregar_saude, aguardar_gravacoes, saude_habits_path,
 )
 
-from ui_helpers import confirmar_exclusao
+from ui_helpers import confirmar_exclusao, fragmento
 
 
 MEAL_LABEL = {"cafe": "Café", "almoco": "Almoço", "jantar": "Jantar", "lanche": "Lanche"}
@@ -32,11 +32,13 @@ QUALITY_LABEL = {"leve": "Leve", "equilibrada": "Equilibrada", "pesada": "Pesada
 # ----------------------------
 # Utils
 # ----------------------------
-def _to_date(x):
-    try:
-        return pd.to_datetime(x, errors="coerce").date()
-    except Exception:
-        return None
+def _to_date_col(s: pd.Series) -> pd.Series:
+    """
+    Converte a coluna inteira para date com um único to_datetime (datas gravadas
+    em ISO), em vez de um to_datetime por linha. Inválidas viram NaT (somem no
+    dropna e nunca são == hoje).
+    """
+    return pd.to_datetime(s, errors="coerce", format="ISO8601").dt.date
 
 
 def _ensure_int(x, default=0):
@@ -160,7 +162,7 @@ def _get_last_weight_kg(peso_logs):
     df = pd.DataFrame(peso_logs)
     if df.empty:
         return None
-    df["date"] = df["date"].apply(_to_date)
+    df["date"] = _to_date_col(df["date"])
     df = df.dropna(subset=["date"]).sort_values("date")
     if df.empty:
         return None
@@ -172,7 +174,7 @@ def _last_weight_and_delta_7d(peso_logs, ref: date):
     if df.empty:
         return None, None
 
-    df["date"] = df["date"].apply(_to_date)
+    df["date"] = _to_date_col(df["date"])
     df = df.dropna(subset=["date"]).sort_values("date")
     if df.empty or "weight_kg" not in df.columns:
         return None, None
@@ -227,7 +229,7 @@ def _water_today_ml(agua_logs, hoje: date):
     df = pd.DataFrame(agua_logs)
     if df.empty:
         return 0.0
-    df["date"] = df["date"].apply(_to_date)
+    df["date"] = _to_date_col(df["date"])
     df = df.dropna(subset=["date"])
     if "amount_ml" not in df.columns:
         return 0.0
@@ -238,18 +240,19 @@ def _activity_today_minutes(activity_logs, hoje: date):
     df = pd.DataFrame(activity_logs)
     if df.empty:
         return 0
-    df["date"] = df["date"].apply(_to_date)
+    df["date"] = _to_date_col(df["date"])
     df = df.dropna(subset=["date"])
     if "minutes" not in df.columns:
         return 0
-    return int(df[df["date"] == hoje]["minutes"].apply(_ensure_int).sum())
+    minutos = pd.to_numeric(df.loc[df["date"] == hoje, "minutes"], errors="coerce")
+    return int(minutos.fillna(0).astype(int).sum())
 
 
 def _workout_today_exists(w_logs, hoje: date):
     df = pd.DataFrame(w_logs)
     if df.empty:
         return False
-    df["date"] = df["date"].apply(_to_date)
+    df["date"] = _to_date_col(df["date"])
     df = df.dropna(subset=["date"])
     return bool((df["date"] == hoje).any())
 
@@ -257,20 +260,22 @@ def _workout_today_exists(w_logs, hoje: date):
 def _get_today_habit(habit_checks, hoje: date):
     date_str = hoje.isoformat()
     for r in habit_checks or []:
-        if isinstance(r, dict) and str(r.get("date")) == date_str:
+        if str(r.get("date")) == date_str:
             return r
     return None
 
 
-def _upsert_today_habit(hoje: date, patch: dict):
-    upsert_habit_check(hoje.isoformat(), patch)
+def _upsert_today_habit(hoje: date, patch: dict, background: bool = False):
+    # Em segundo plano, falhas caem em _habits_bg_falhas (conferida no próximo render)
+    falhas = st.session_state.setdefault("_habits_bg_falhas", []) if background else None
+    upsert_habit_check(hoje.isoformat(), patch, background=background, falhas=falhas)
 
 
 def _get_meals_today(meals, hoje: date):
     df = pd.DataFrame(meals)
     if df.empty:
         return pd.DataFrame(columns=["id", "date", "meal", "quality", "notes"])
-    df["date_dt"] = df["date"].apply(_to_date)
+    df["date_dt"] = _to_date_col(df["date"])
     df = df[df["date_dt"] == hoje].copy()
     return df
 
@@ -299,7 +304,7 @@ def _weekly_consistency(habit_checks, ref: date):
     if df.empty:
         return {"days_cared": 0, "move_days": 0, "sleep_days": 0}
 
-    df["date_dt"] = df["date"].apply(_to_date)
+    df["date_dt"] = _to_date_col(df["date"])
     df = df.dropna(subset=["date_dt"])
     df = df[(df["date_dt"] >= ini) & (df["date_dt"] <= fim)].copy()
     if df.empty:
@@ -330,15 +335,17 @@ def _drink(ml: int):
 
 
 def _quick_activity(label: str, minutes: int, intensity="leve"):
-    inserir_activity_log({
-        "date": date.today().isoformat(),
-        "activity": label,
-        "minutes": int(minutes),
-        "intensity": intensity
-    })
-    st.session_state.activity_logs = buscar_activity_logs()
+    # ✅ Atividade + hábito do dia num único commit
+    with batch_writes():
+        inserir_activity_log({
+            "date": date.today().isoformat(),
+            "activity": label,
+            "minutes": int(minutes),
+            "intensity": intensity
+        })
+        _upsert_today_habit(date.today(), {"move_done": True})
 
-    _upsert_today_habit(date.today(), {"move_done": True})
+    st.session_state.activity_logs = buscar_activity_logs()
     st.session_state.habits = buscar_habit_checks()
 
     _reset_ui_flags()
@@ -349,6 +356,7 @@ def _quick_activity(label: str, minutes: int, intensity="leve"):
 # ---------------------------------------------
 # RENDER
 # ---------------------------------------------
+@fragmento
 def render_saude():
     st.markdown("""
       <div class="header-container">
@@ -362,25 +370,24 @@ def render_saude():
         if k not in st.session_state:
             st.session_state[k] = False
 
-    # Estado inicial
-    if "saude_cfg" not in st.session_state:
-        st.session_state.saude_cfg = buscar_saude_config()
-    if "profile" not in st.session_state:
-        st.session_state.profile = buscar_saude_profile()
-
-    if "peso_logs" not in st.session_state:
-        st.session_state.peso_logs = buscar_peso_logs()
-    if "agua_logs" not in st.session_state:
-        st.session_state.agua_logs = buscar_agua_logs()
-    if "w_logs" not in st.session_state:
-        st.session_state.w_logs = buscar_workout_logs()
-
-    if "meals" not in st.session_state:
-        st.session_state.meals = buscar_meals()
-    if "habits" not in st.session_state:
-        st.session_state.habits = buscar_habit_checks()
-    if "activity_logs" not in st.session_state:
-        st.session_state.activity_logs = buscar_activity_logs()
+    # Gravação de hábito em segundo plano falhou: descarta o valor otimista da sessão
+    # (o lote abaixo relê o que está de fato no GitHub)
+    if st.session_state.get("_habits_bg_falhas"):
+        st.session_state._habits_bg_falhas.clear()
+        st.session_state.pop("habits", None)
+        st.warning("Não foi possível salvar o hábito do dia automaticamente. Tente de novo em instantes.")
+
+    # Estado inicial (1 requisição em lote para os 8 arquivos)
+    chaves = {
+        "saude_cfg": "config", "profile": "profile",
+        "peso_logs": "peso_logs", "agua_logs": "agua_logs", "w_logs": "workout_logs",
+        "meals": "meals", "habits": "habit_checks", "activity_logs": "activity_logs",
+    }
+    if any(k not in st.session_state for k in chaves):
+        aguardar_gravacoes(saude_habits_path())  # não reler habit_checks com um upsert ainda na fila
+        lote = carregar_saude()
+        for k, src in chaves.items():
+            st.session_state.setdefault(k, lote[src])
 
     hoje = date.today()
 
@@ -401,8 +408,15 @@ def render_saude():
 
     # Se houve movimento inferido, garante hábito "move_done"
     if move_infer and not move_done:
-        _upsert_today_habit(hoje, {"move_done": True})
-        st.session_state.habits = buscar_habit_checks()
+        # ✅ Gravação automática em segundo plano: o render não espera o commit no GitHub;
+        # a sessão já reflete o valor localmente
+        _upsert_today_habit(hoje, {"move_done": True}, background=True)
+        if habit_today is not None:
+            habit_today["move_done"] = True
+        else:
+            st.session_state.habits = list(st.session_state.habits or []) + [
+                {"date": hoje.isoformat(), "water_done": False, "move_done": True, "sleep_done": False}
+            ]
         move_done = True
 
     tab_painel, tab_hist = st.tabs(["🧠 Painel", "📈 Histórico"])
@@ -753,7 +767,7 @@ def render_saude():
         # Água 14 dias + linha de meta (MVP: meta atual como referência, não histórica)
         dfa = pd.DataFrame(st.session_state.agua_logs)
         if not dfa.empty:
-            dfa["date"] = dfa["date"].apply(_to_date)
+            dfa["date"] = _to_date_col(dfa["date"])
             dfa = dfa.dropna(subset=["date"])
             if "amount_ml" in dfa.columns:
                 agua_day = dfa.groupby("date")["amount_ml"].sum().reset_index()
@@ -769,7 +783,7 @@ def render_saude():
         # Movimento 14 dias + excluir registros
         dact = pd.DataFrame(st.session_state.activity_logs)
         if not dact.empty:
-            dact["date"] = dact["date"].apply(_to_date)
+            dact["date"] = _to_date_col(dact["date"])
             dact = dact.dropna(subset=["date"])
             if "minutes" in dact.columns:
                 act_day = dact.groupby("date")["minutes"].sum().reset_index()
@@ -802,7 +816,7 @@ def render_saude():
         # Alimentação (padrão 14 dias)
         dfm = pd.DataFrame(st.session_state.meals)
         if not dfm.empty:
-            dfm["date"] = dfm["date"].apply(_to_date)
+            dfm["date"] = _to_date_col(dfm["date"])
             dfm = dfm.dropna(subset=["date"])
             dfm14 = dfm[(dfm["date"] >= ini14) & (dfm["date"] <= hoje)].copy()
             if not dfm14.empty:
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import functools
 import time
 import streamlit as st
 from datetime import datetime, date, timedelta, time as dtime
@@ -10,9 +11,9 @@ from github_db import (
     buscar_tasks, inserir_task, atualizar_task,
     deletar_task,            # fallback
     deletar_tasks_bulk,      # recomendado (1 commit)
-    buscar_pessoas
+    carregar_tarefas,        # estado inicial em lote
 )
-from ui_helpers import confirmar_exclusao
+from ui_helpers import confirmar_exclusao, fragmento
 from nlp_pt import parse_quick_entry
 
 STATUS_OPCOES = ["todo", "doing", "done", "cancelled"]
@@ -37,9 +38,11 @@ def _clean_iso(s: str | None) -> str | None:
     return s[:-1] if s.endswith("Z") else s
 
 
-def _iso_to_date(x):
+# ✅ Cada tarefa tem a data conferida várias vezes por rerun (filtros, ordenação,
+# card): o parse é memoizado pela string ISO (date/datetime são imutáveis)
+@functools.lru_cache(maxsize=4096)
+def _parse_date(x: str | None) -> date | None:
     try:
-        x = _clean_iso(x)
         if not x:
             return None
         if len(x) == 10:
@@ -49,14 +52,22 @@ def _iso_to_date(x):
         return None
 
 
-def _iso_to_dt(x):
+@functools.lru_cache(maxsize=4096)
+def _parse_dt(x: str | None) -> datetime | None:
     try:
-        x = _clean_iso(x)
         return datetime.fromisoformat(x) if x else None
     except Exception:
         return None
 
 
+def _iso_to_date(x):
+    return _parse_date(_clean_iso(x))
+
+
+def _iso_to_dt(x):
+    return _parse_dt(_clean_iso(x))
+
+
 def _fmt_date_br(d: date | None) -> str:
     return d.strftime("%d/%m/%Y") if d else "—"
 
@@ -129,6 +140,7 @@ def _commit_patch(task_id: int, patch: dict, backup: list[dict]) -> bool:
 # -------------------------
 # Render
 # -------------------------
+@fragmento
 def render_tarefas():
     st.markdown(
         """
@@ -141,11 +153,11 @@ def render_tarefas():
     )
 
     # ========= Estado base =========
-    if "tasks" not in st.session_state:
-        st.session_state.tasks = buscar_tasks()
-
-    if "pessoas" not in st.session_state or not st.session_state.pessoas:
-        st.session_state.pessoas = buscar_pessoas()
+    if "tasks" not in st.session_state or not st.session_state.get("pessoas"):
+        # ✅ tasks + pessoas numa requisição só
+        tasks, pessoas = carregar_tarefas()
+        st.session_state.setdefault("tasks", tasks)
+        st.session_state.pessoas = st.session_state.get("pessoas") or pessoas
 
     PESSOAS = st.session_state.pessoas or ["Guilherme", "Alynne", "Ambos"]
 
@@ -325,10 +337,10 @@ def render_tarefas():
             out = [t for t in out if _task_day(t) == hoje]
         elif janela == "Próximos 7 dias":
             lim = hoje + timedelta(days=7)
-            out = [t for t in out if _task_day(t) and hoje <= _task_day(t) <= lim]
+            out = [t for t in out if (d := _task_day(t)) and hoje <= d <= lim]
         elif janela == "Próximos 30 dias":
             lim = hoje + timedelta(days=30)
-            out = [t for t in out if _task_day(t) and hoje <= _task_day(t) <= lim]
+            out = [t for t in out if (d := _task_day(t)) and hoje <= d <= lim]
 
         def sort_key(t):
             dd = _task_day(t) or date.max